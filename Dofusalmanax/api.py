@@ -0,0 +1,306 @@
+import asyncio
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import dofusdude
+import urllib3
+from dofusdude.rest import ApiException
+
+
+class ApiTimeout(ApiException):
+    """Raised when a Dofus Dude call exceeds its timeout."""
+
+
+class CircuitOpen(ApiException):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling the API while it is failing.
+
+    The breaker opens when, over the last ``window`` calls, the share of
+    failed calls or of calls slower than ``slow_call`` seconds reaches
+    ``threshold``. After ``cooldown`` seconds one probe call is let
+    through (half open): if it succeeds the breaker closes, otherwise it
+    opens again.
+
+    Every allowed call gets a ticket, the breaker generation it started
+    in. Each state change starts a new generation, so calls that started
+    before the breaker last changed state can't close or reopen it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 10,
+        threshold: float = 0.5,
+        slow_call: float = 5.0,
+        cooldown: float = 30.0,
+    ):
+        self.min_calls = min_calls
+        self.threshold = threshold
+        self.slow_call = slow_call
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._results = deque(maxlen=window)  # (failed, slow) per call
+        self._generation = 0
+        self._probe = None  # ticket of the half-open probe in flight
+        self.opened_at = 0.0
+
+        # Metrics
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self) -> Optional[int]:
+        """
+        Ticket of a call that may go through right now, to hand back to
+        ``record`` or ``cancel``, or None when it must not be made.
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                self.rejected += 1
+                return None
+            self._change(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._probe is not None:
+                self.rejected += 1
+                return None
+            # The probe gets a generation of its own
+            self._generation += 1
+            self._probe = self._generation
+        return self._generation
+
+    def record(
+        self,
+        ticket: int,
+        failed: bool,
+        duration: float,
+        slow_call: Optional[float] = None,
+    ):
+        """
+        Record the outcome of an allowed call. ``slow_call`` overrides
+        the slow call threshold for calls expected to take long.
+        """
+        if ticket != self._generation:
+            # Started before the breaker last changed state
+            return
+
+        if slow_call is None:
+            slow_call = self.slow_call
+        slow = duration >= slow_call
+        if self.state == self.HALF_OPEN:
+            if failed or slow:
+                self._open()
+            else:
+                self._change(self.CLOSED)
+            return
+
+        self._results.append((failed, slow))
+        if len(self._results) < self.min_calls:
+            return
+        failures = sum(failed for failed, slow in self._results)
+        slow_calls = sum(slow for failed, slow in self._results)
+        limit = self.threshold * len(self._results)
+        if failures >= limit or slow_calls >= limit:
+            self._open()
+
+    def cancel(self, ticket: int):
+        """Forget an allowed call that was cancelled before it finished."""
+        if ticket == self._probe:
+            # Let another call probe
+            self._probe = None
+
+    def _change(self, state: str):
+        self.state = state
+        self._generation += 1
+        self._probe = None
+
+    def _open(self):
+        self._change(self.OPEN)
+        self.opened_at = time.monotonic()
+        self.opened += 1
+        self._results.clear()
+
+    def stats(self) -> dict:
+        results = len(self._results)
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(
+                0.0, self.opened_at + self.cooldown - time.monotonic()
+            )
+        return {
+            "state": self.state,
+            "failure_rate": (
+                sum(failed for failed, slow in self._results) / results
+                if results
+                else 0.0
+            ),
+            "slow_rate": (
+                sum(slow for failed, slow in self._results) / results
+                if results
+                else 0.0
+            ),
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in": retry_in,
+        }
+
+
+class DofusDudeClient:
+    """
+    Async wrapper around the synchronous dofusdude client.
+
+    Every call runs on a bounded worker pool so the event loop never waits
+    on HTTP. Transport errors and timeouts are raised as ApiException, so
+    callers only have one exception type to handle. While the API keeps
+    failing, the circuit breaker makes calls raise CircuitOpen at once.
+
+    The underlying ApiClient lives as long as this object: its urllib3
+    pool keeps up to ``pool_size`` HTTP/1.1 connections alive, one per
+    worker, so repeated calls skip the TCP and TLS setup.
+    """
+
+    def __init__(self, configuration, pool_size: int = 10, timeout=10.0):
+        self.configuration = configuration
+        self.pool_size = pool_size
+        self.timeout = timeout
+        configuration.connection_pool_maxsize = pool_size
+        self.api_client = dofusdude.ApiClient(configuration)
+        self.api_client.set_default_header("Connection", "keep-alive")
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="dofusdude"
+        )
+        self._monitor = None
+        self.breaker = CircuitBreaker()
+
+        # Metrics
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.inflight = 0
+        self.call_time = 0.0
+        self.loop_lag = 0.0
+        self.loop_lag_max = 0.0
+        self.loop_blocked = 0.0
+
+    async def call(
+        self,
+        api_class: str,
+        method: str,
+        *args,
+        timeout=None,
+        slow_call=None,
+        **kwargs,
+    ):
+        """
+        Call ``dofusdude.<api_class>(client).<method>(*args, **kwargs)``
+        on the worker pool and return its result. Bulk calls pass their
+        own ``slow_call`` threshold so the breaker doesn't count them as
+        slow against the one of user facing calls.
+        """
+        ticket = self.breaker.allow()
+        if ticket is None:
+            raise CircuitOpen(
+                status=503, reason="Dofus Dude API unavailable (circuit open)"
+            )
+
+        timeout = float(timeout or self.timeout)
+        api_instance = getattr(dofusdude, api_class)(self.api_client)
+        func = functools.partial(
+            getattr(api_instance, method),
+            *args,
+            _request_timeout=timeout,
+            **kwargs,
+        )
+        loop = asyncio.get_running_loop()
+
+        self.calls += 1
+        self.inflight += 1
+        start = time.perf_counter()
+        failed = None
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, func), timeout
+            )
+            failed = False
+            return result
+        except asyncio.TimeoutError:
+            failed = True
+            self.timeouts += 1
+            raise ApiTimeout(status=0, reason=f"Timed out after {timeout}s")
+        except urllib3.exceptions.HTTPError as e:
+            failed = True
+            self.errors += 1
+            raise ApiException(status=0, reason=str(e))
+        except ApiException as e:
+            # A 404 is an answer, only outages count against the breaker
+            failed = not e.status or e.status >= 500 or e.status == 429
+            self.errors += 1
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.inflight -= 1
+            self.call_time += duration
+            if failed is None:
+                self.breaker.cancel(ticket)
+            else:
+                self.breaker.record(ticket, failed, duration, slow_call)
+
+    def start_monitor(self, interval: float = 0.5, threshold: float = 0.05):
+        """
+        Start measuring event loop lag: how late a sleep of ``interval``
+        wakes up. Lags above ``threshold`` add to ``loop_blocked``.
+        """
+        if self._monitor is None:
+            self._monitor = asyncio.create_task(
+                self._monitor_loop(interval, threshold)
+            )
+
+    async def _monitor_loop(self, interval, threshold):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.loop_lag = max(0.0, loop.time() - start - interval)
+            self.loop_lag_max = max(self.loop_lag_max, self.loop_lag)
+            if self.loop_lag > threshold:
+                self.loop_blocked += self.loop_lag
+
+    def close(self):
+        """
+        Stop taking calls. Calls already queued still run, since their
+        callers are waiting on them; the connections are closed once the
+        last one is done.
+        """
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        threading.Thread(
+            target=self._shutdown, name="dofusdude-close", daemon=True
+        ).start()
+
+    def _shutdown(self):
+        self._executor.shutdown(wait=True)
+        self.api_client.rest_client.pool_manager.clear()
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "inflight": self.inflight,
+            "avg_call": self.call_time / self.calls if self.calls else 0.0,
+            "loop_lag": self.loop_lag,
+            "loop_lag_max": self.loop_lag_max,
+            "loop_blocked": self.loop_blocked,
+        }
@@ -0,0 +1,196 @@
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import dofusdude
+
+from .utils import normalize_name
+
+
+class AlmanaxSummary(NamedTuple):
+    """What the cog shows of an Almanax day."""
+
+    bonus_type: Optional[str]
+    bonus_description: Optional[str]
+    tribute_name: Optional[str]
+    tribute_quantity: Optional[int]
+    tribute_image_url: Optional[str]
+    reward_kamas: Optional[int]
+
+    @classmethod
+    def from_entry(cls, entry) -> "AlmanaxSummary":
+        bonus = entry.bonus
+        tribute = entry.tribute
+        item = tribute.item if tribute else None
+        image_urls = item.image_urls if item else None
+        return cls(
+            bonus.type.name if bonus and bonus.type else None,
+            bonus.description if bonus else None,
+            item.name if item else None,
+            tribute.quantity if tribute else None,
+            image_urls.sd if image_urls else None,
+            entry.reward_kamas,
+        )
+
+
+class AlmanaxCalendar:
+    """
+    Almanax days already fetched, per language.
+
+    The Almanax of a date never changes, so every day fetched is kept in
+    memory and in one JSON file per language, and served from there from
+    then on.
+
+    Days are also indexed by bonus type and by tribute item, each key
+    holding its sorted dates, so searches bisect a few date lists instead
+    of walking the calendar.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._days = {}  # language -> {ISO date: dofusdude.Almanax}
+        # language -> {normalized bonus type name or id: sorted ISO dates}
+        self._bonus_dates = {}
+        # language -> {normalized tribute item name: sorted ISO dates}
+        self._tribute_dates = {}
+
+    def _path(self, language: str) -> Path:
+        return self.directory / f"{language}.json"
+
+    def days(self, language: str) -> Dict[str, "dofusdude.Almanax"]:
+        """ISO date -> Almanax of every known day of a language."""
+        return self._days.setdefault(language, {})
+
+    def load(self, language: str):
+        """Read the stored days of a language (blocking)."""
+        try:
+            with open(self._path(language), encoding="utf-8") as f:
+                payloads = json.load(f)
+        except (OSError, ValueError):
+            payloads = {}
+        self._days[language] = {}
+        self._bonus_dates[language] = {}
+        self._tribute_dates[language] = {}
+        self.update(
+            language,
+            (dofusdude.Almanax.from_dict(payload) for payload in payloads.values()),
+        )
+
+    def save(self, language: str, payloads: dict):
+        """Write the days of a language (blocking)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(language)
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(payloads, f, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    def payloads(self, language: str) -> dict:
+        """JSON-ready copy of the days of a language, for ``save``."""
+        return {day: entry.to_dict() for day, entry in self.days(language).items()}
+
+    def get(self, language: str, day: date) -> Optional["dofusdude.Almanax"]:
+        return self.days(language).get(day.isoformat())
+
+    def missing(self, language: str, start: date, end: date) -> List[date]:
+        """Days from ``start`` to ``end`` (included) not fetched yet."""
+        days = self.days(language)
+        return [
+            start + timedelta(days=offset)
+            for offset in range((end - start).days + 1)
+            if (start + timedelta(days=offset)).isoformat() not in days
+        ]
+
+    def update(self, language: str, entries) -> int:
+        """Add fetched days, returns how many were new."""
+        days = self.days(language)
+        added = 0
+        for entry in entries:
+            if entry.var_date is None:
+                continue
+            previous = days.get(entry.var_date)
+            if previous is not None:
+                self._unindex(language, entry.var_date, previous)
+            else:
+                added += 1
+            days[entry.var_date] = entry
+            self._index(language, entry.var_date, entry)
+        return added
+
+    @staticmethod
+    def _keys(entry):
+        """(bonus keys, tribute keys) an Almanax day is indexed under."""
+        bonus_type = entry.bonus.type if entry.bonus else None
+        bonus_keys = {
+            normalize_name(value)
+            for value in (
+                getattr(bonus_type, "name", None),
+                getattr(bonus_type, "id", None),
+            )
+            if value
+        }
+        item = entry.tribute.item if entry.tribute else None
+        tribute_keys = {normalize_name(item.name)} if item and item.name else set()
+        return bonus_keys, tribute_keys
+
+    def _index(self, language, day: str, entry):
+        bonus_keys, tribute_keys = self._keys(entry)
+        for index, keys in (
+            (self._bonus_dates.setdefault(language, {}), bonus_keys),
+            (self._tribute_dates.setdefault(language, {}), tribute_keys),
+        ):
+            for key in keys:
+                insort(index.setdefault(key, []), day)
+
+    def _unindex(self, language, day: str, entry):
+        bonus_keys, tribute_keys = self._keys(entry)
+        for index, keys in (
+            (self._bonus_dates.get(language, {}), bonus_keys),
+            (self._tribute_dates.get(language, {}), tribute_keys),
+        ):
+            for key in keys:
+                dates = index.get(key, [])
+                position = bisect_left(dates, day)
+                if position < len(dates) and dates[position] == day:
+                    del dates[position]
+
+    def search(
+        self,
+        language: str,
+        text: str,
+        start: date,
+        end: Optional[date] = None,
+    ) -> List[Tuple[str, "dofusdude.Almanax"]]:
+        """
+        (ISO date, Almanax) of the days from ``start`` to ``end`` (or the
+        last known day) whose bonus type or tribute item matches ``text``,
+        in date order. An exact bonus type or item name only matches
+        itself, anything else matches every name containing it.
+        """
+        key = normalize_name(text.strip())
+        indexes = (
+            self._bonus_dates.get(language, {}),
+            self._tribute_dates.get(language, {}),
+        )
+        matched = [index[key] for index in indexes if key in index]
+        if not matched:
+            matched = [
+                dates
+                for index in indexes
+                for name, dates in index.items()
+                if key in name
+            ]
+
+        first = start.isoformat()
+        last = end.isoformat() if end else None
+        found = set()
+        for dates in matched:
+            low = bisect_left(dates, first)
+            high = bisect_right(dates, last) if last else len(dates)
+            found.update(dates[low:high])
+
+        days = self.days(language)
+        return [(day, days[day]) for day in sorted(found)]
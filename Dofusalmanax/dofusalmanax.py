@@ -1,9 +1,64 @@
+import asyncio
+import re
 import dofusdude
 import discord
 from dofusdude.rest import ApiException
 from redbot.core import commands, Config
-from discord.ext import tasks
-from datetime import datetime, timedelta, timezone
+from redbot.core.data_manager import cog_data_path
+from datetime import date, datetime, timedelta
+
+from .api import DofusDudeClient
+from .calendar_cache import AlmanaxCalendar, AlmanaxSummary
+from .scheduler import DailyJob, Scheduler, almanax_day, paris_time
+from .views import Paginator
+
+SUPPORTED_LANGUAGES = ['en', 'es', 'fr', 'de', 'pt']
+
+# Daily posts: channels sent to at once, attempts per message, and the
+# first pause between attempts (doubled after every failure)
+SEND_CONCURRENCY = 5
+SEND_ATTEMPTS = 3
+SEND_BACKOFF = 5
+
+# almanaxsearch: days searched by default, longest period that can be
+# asked for, and results per page
+SEARCH_DAYS = 365
+SEARCH_LIMIT_DAYS = 2 * 365
+SEARCH_PAGE_SIZE = 8
+
+# Messages shared by several commands
+INVALID_DATE = {
+    "en": "Invalid date format. Please use yyyy-mm-dd.",
+    "es": "Formato de fecha inválido. Por favor, use aaaa-mm-dd.",
+    "fr": "Format de date invalide. Veuillez utiliser aaaa-mm-jj.",
+    "de": "Ungültiges Datumsformat. Bitte verwenden Sie jjjj-mm-tt.",
+    "pt": "Formato de data inválido. Por favor, use aaaa-mm-dd."
+}
+API_ERROR = {
+    "en": "Error when fetching Almanax data: {error}",
+    "es": "Error al obtener los datos del Almanax: {error}",
+    "fr": "Erreur lors de la récupération des données de l'Almanax : {error}",
+    "de": "Fehler beim Abrufen der Almanax-Daten: {error}",
+    "pt": "Erro ao buscar os dados do Almanax: {error}"
+}
+NO_RESULTS = {
+    "en": "No Almanax day matches `{query}` in that period.",
+    "es": "Ningún día del Almanax coincide con `{query}` en ese periodo.",
+    "fr": "Aucun jour de l'Almanax ne correspond à `{query}` sur cette période.",
+    "de": "Kein Almanax-Tag passt zu `{query}` in diesem Zeitraum.",
+    "pt": "Nenhum dia do Almanax corresponde a `{query}` nesse período."
+}
+
+# Minutes before midnight the next day's embeds are fetched and rendered,
+# so the midnight post only has to send them
+PRERENDER_MINUTES = 10
+
+# Calendar cache: days fetched ahead of today and around a requested day,
+# the longest range the API returns in one call, and how long such a call
+# may take (it doesn't count as a slow call for the breaker below that)
+PREFETCH_DAYS = 30
+RANGE_LIMIT = 370
+RANGE_TIMEOUT = 30
 
 class Dofusalmanax(commands.Cog):
     """A cog to fetch and send Almanax data daily using the Dofus Dude API."""
@@ -13,66 +68,150 @@ class Dofusalmanax(commands.Cog):
         self.configuration = dofusdude.Configuration(
             host="https://api.dofusdu.de"
         )
+        # Every Dofus Dude call goes through this async client
+        self.client = DofusDudeClient(self.configuration, pool_size=2)
         self.config = Config.get_conf(self, identifier=47294748274, force_registration=True)
         self.config.register_global(
-            selected_language="es",
+            selected_language="es",  # Language of the guilds without one
+            # Settings of the single guild the cog used to post to, moved
+            # to that guild on startup
+            almanax_role=None,
+            target_channel=None,
+            warning_hours=0,
+            last_fired={}  # Scheduler job -> last Almanax day it ran for
+        )
+        self.config.register_guild(
+            selected_language=None,  # None => global
             almanax_role=None,
             target_channel=None,
             warning_hours=0  # Default: No warning
         )
         self.selected_language = "es"
-        self.almanax_role = None
-        self.target_channel = None
-        self.warning_hours = 0
+        # Guild id -> settings, so the daily posts never await Config
+        self.guild_settings = {}
+        # Bounds the messages in flight during a daily post
+        self.send_semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+        # Every Almanax day fetched, kept on disk
+        self.calendar = AlmanaxCalendar(cog_data_path(self) / "calendar")
+        # Language -> lock, so one range call fills a language at a time
+        self.calendar_locks = {}
+        # (ISO date, language) -> embed rendered ahead of midnight
+        self.prerendered = {}
 
-        # Start the loops
-        self.almanax_loop.start()
-        self.warning_loop.start()
+        # Daily posts, at midnight and before closing in French time. Guilds
+        # warned the same number of hours before closing share one job.
+        self.scheduler = Scheduler(self.config.last_fired, ready=self._ready)
+        self.scheduler.add(DailyJob("almanax", self._almanax_time, self._almanax_end, self.post_almanax))
+        self.scheduler.add(DailyJob("prefetch", self._prefetch_time, self._almanax_end, self.prefetch_calendar))
+        self.scheduler.add(DailyJob("prerender", self._prerender_time, self._almanax_time, self.prerender_almanax))
 
     async def cog_load(self):
-        """Load the stored settings when the cog is loaded."""
+        """Load the stored settings and start the scheduler."""
         self.selected_language = await self.config.selected_language()
-        self.almanax_role = await self.config.almanax_role()
-        self.target_channel = await self.config.target_channel()
-        self.warning_hours = await self.config.warning_hours()
+        self.guild_settings = await self.config.all_guilds()
+        self._sync_warning_jobs()
+        for language in SUPPORTED_LANGUAGES:
+            await asyncio.to_thread(self.calendar.load, language)
+        await self.scheduler.start()
+
+    async def _ready(self):
+        """Wait for the bot, then move the old global settings to their guild."""
+        await self.bot.wait_until_ready()
+
+        target_channel = await self.config.target_channel()
+        if not target_channel:
+            return
+        channel = self.bot.get_channel(target_channel)
+        if channel is None:
+            print(f"Error: Target channel with ID {target_channel} not found.")
+            return
+
+        await self._set(
+            channel.guild,
+            target_channel=target_channel,
+            almanax_role=await self.config.almanax_role(),
+            warning_hours=await self.config.warning_hours()
+        )
+        await self.config.target_channel.set(None)
+
+    def _settings(self, guild):
+        """Settings of a guild (or guild id), with the defaults when it has none."""
+        settings = self.guild_settings.get(getattr(guild, "id", guild))
+        if settings is None:
+            settings = {"selected_language": None, "almanax_role": None, "target_channel": None, "warning_hours": 0}
+        return settings
+
+    def _language(self, guild):
+        return self._settings(guild)["selected_language"] or self.selected_language
+
+    async def _set(self, guild, **settings):
+        """Store settings of a guild in Config and in memory."""
+        guild_config = self.config.guild(guild)
+        for key, value in settings.items():
+            await guild_config.get_attr(key).set(value)
+        self.guild_settings[guild.id] = dict(self._settings(guild), **settings)
+        self._sync_warning_jobs()
+
+    def _subscribed(self):
+        """(guild id, settings) of every guild with a target channel."""
+        return [
+            (guild_id, settings)
+            for guild_id, settings in self.guild_settings.items()
+            if settings.get("target_channel")
+        ]
+
+    def _sync_warning_jobs(self):
+        """Keep one warning job per warning_hours of the subscribed guilds."""
+        wanted = {settings.get("warning_hours") or 0 for guild_id, settings in self._subscribed()} - {0}
+        for name in self.scheduler.names():
+            if name.startswith("warning:") and int(name.split(":")[1]) not in wanted:
+                self.scheduler.remove(name)
+        for hours in wanted:
+            name = f"warning:{hours}"
+            if name not in self.scheduler:
+                self.scheduler.add(DailyJob(
+                    name,
+                    lambda day, hours=hours: self._closing_time(day) - timedelta(hours=hours),
+                    self._closing_time,
+                    lambda day, hours=hours: self.post_warning(day, hours)
+                ))
 
     async def cog_unload(self):
-        """Stop the loops when the cog is unloaded."""
-        self.almanax_loop.cancel()
-        self.warning_loop.cancel()
+        """Stop the scheduler when the cog is unloaded."""
+        self.scheduler.stop()
+        self.client.close()
 
     @commands.guildowner()
+    @commands.guild_only()
     @commands.command()
     async def almanaxlang(self, ctx, language: str):
         """
-        Change the almanax language. Available languages: en, es, fr, de, pt
+        Change the almanax language of this server. Available languages: en, es, fr, de, pt
         """
-        supported_languages = ['en', 'es', 'fr', 'de', 'pt']
-        if language in supported_languages:
-            await self.config.selected_language.set(language)
-            self.selected_language = language
+        if language in SUPPORTED_LANGUAGES:
+            await self._set(ctx.guild, selected_language=language)
             await ctx.send(f"Changed language to {language}")
         else:
             await ctx.send("Language not supported. Supported languages: en, es, fr, de, pt")
             
     @commands.guildowner()
+    @commands.guild_only()
     @commands.command()
     async def almanaxrole(self, ctx, role: discord.Role):
         """
         Set the role to be mentioned in Almanax messages.
         """
-        await self.config.almanax_role.set(role.name)
-        self.almanax_role = role.name
+        await self._set(ctx.guild, almanax_role=role.name)
         await ctx.send(f"The role `{role.name}` has been set for Almanax notifications.")
 
     @commands.guildowner()
+    @commands.guild_only()
     @commands.command()
     async def almanaxchannel(self, ctx, channel: discord.TextChannel):
         """
-        Set the channel where Almanax messages will be sent.
+        Set the channel of this server where Almanax messages will be sent.
         """
-        await self.config.target_channel.set(channel.id)
-        self.target_channel = channel.id
+        await self._set(ctx.guild, target_channel=channel.id)
 
         # Translation dictionary
         translations = {
@@ -84,10 +223,11 @@ class Dofusalmanax(commands.Cog):
         }
 
         # Get the translation and send the message
-        message = translations.get(self.selected_language, translations["en"]).format(channel=channel.mention)
+        message = translations.get(self._language(ctx.guild), translations["en"]).format(channel=channel.mention)
         await ctx.send(message)
 
     @commands.admin()
+    @commands.guild_only()
     @commands.command()
     async def almanaxwarning(self, ctx, hours: int):
         """
@@ -97,8 +237,7 @@ class Dofusalmanax(commands.Cog):
             await ctx.send("Hours must be a positive number.")  # No need for i18n here
             return
 
-        await self.config.warning_hours.set(hours)
-        self.warning_hours = hours
+        await self._set(ctx.guild, warning_hours=hours)
 
         # Translation dictionary
         translations = {
@@ -110,7 +249,7 @@ class Dofusalmanax(commands.Cog):
         }
 
         # Get the translation and send the message
-        message = translations.get(self.selected_language, translations["en"]).format(hours=hours)
+        message = translations.get(self._language(ctx.guild), translations["en"]).format(hours=hours)
         await ctx.send(message)
         
     @commands.command()
@@ -122,15 +261,7 @@ class Dofusalmanax(commands.Cog):
         try:
             datetime.strptime(date, '%Y-%m-%d')
         except ValueError:
-            # Translation dictionary for invalid date format error
-            translations = {
-                "en": "Invalid date format. Please use yyyy-mm-dd.",
-                "es": "Formato de fecha inválido. Por favor, use aaaa-mm-dd.",
-                "fr": "Format de date invalide. Veuillez utiliser aaaa-mm-jj.",
-                "de": "Ungültiges Datumsformat. Bitte verwenden Sie jjjj-mm-tt.",
-                "pt": "Formato de data inválido. Por favor, use aaaa-mm-dd."
-            }
-            message = translations.get(self.selected_language, translations["en"])
+            message = INVALID_DATE.get(self._language(ctx.guild), INVALID_DATE["en"])
             await ctx.send(message)
             return
 
@@ -138,88 +269,235 @@ class Dofusalmanax(commands.Cog):
         try:
             await self.send_almanax_message(ctx.channel, date, mention_role=False)
         except ApiException as e:
-            # Translation dictionary for API error
-            translations = {
-                "en": "Error when fetching Almanax data: {error}",
-                "es": "Error al obtener los datos del Almanax: {error}",
-                "fr": "Erreur lors de la récupération des données de l'Almanax : {error}",
-                "de": "Fehler beim Abrufen der Almanax-Daten: {error}",
-                "pt": "Erro ao buscar os dados do Almanax: {error}"
-            }
-            message = translations.get(self.selected_language, translations["en"]).format(error=e)
+            message = API_ERROR.get(self._language(ctx.guild), API_ERROR["en"]).format(error=e)
             await ctx.send(message)
 
-    @tasks.loop(seconds=60)
-    async def almanax_loop(self):
-        """Send the Almanax message daily at midnight (UTC+1)."""
-        now = datetime.now(timezone.utc) + timedelta(hours=1)  # Adjust UTC to UTC+1 (France)
-        if now.hour == 0 and now.minute == 0:  # Check if it's midnight in UTC+1
-            if not self.target_channel:
-                return  # Skip if no target channel is set
+    @commands.command()
+    async def almanaxsearch(self, ctx, *, query: str):
+        """
+        Find the Almanax days with a bonus type or a tribute item.
+        Searches the coming year, or add one or two dates (yyyy-mm-dd) to
+        search from a date or between two dates, for example:
+        `almanaxsearch wisdom 2026-01-01 2026-03-31`
+        """
+        language = self._language(ctx.guild)
+        dates = re.findall(r"\d{4}-\d{2}-\d{2}", query)
+        text = re.sub(r"\d{4}-\d{2}-\d{2}", "", query).strip()
+        try:
+            dates = sorted(datetime.strptime(value, '%Y-%m-%d').date() for value in dates[:2])
+        except ValueError:
+            await ctx.send(INVALID_DATE.get(language, INVALID_DATE["en"]))
+            return
+        if not text:
+            await ctx.send_help(ctx.command)
+            return
 
-            # Get the channel object
-            channel = self.bot.get_channel(self.target_channel)
-            if not channel:
-                print(f"Error: Target channel with ID {self.target_channel} not found.")
-                return
+        start = dates[0] if dates else almanax_day()
+        end = dates[1] if len(dates) > 1 else start + timedelta(days=SEARCH_DAYS - 1)
+        end = min(end, start + timedelta(days=SEARCH_LIMIT_DAYS - 1))
+
+        # Fill the searched period first, a whole year is a single call
+        error = None
+        try:
+            async with self._calendar_lock(language):
+                await self._fill_calendar(language, start, end)
+        except ApiException as e:
+            error = e
 
-            # Call send_almanax_message with both channel and date
-            await self.send_almanax_message(channel, now.strftime('%Y-%m-%d'))
+        results = self.calendar.search(language, text, start, end)
+        if not results:
+            if error is not None:
+                await ctx.send(API_ERROR.get(language, API_ERROR["en"]).format(error=error))
+            else:
+                await ctx.send(NO_RESULTS.get(language, NO_RESULTS["en"]).format(query=text))
+            return
 
+        pages = []
+        for first in range(0, len(results), SEARCH_PAGE_SIZE):
+            lines = []
+            for day, entry in results[first:first + SEARCH_PAGE_SIZE]:
+                summary = AlmanaxSummary.from_entry(entry)
+                line = f"**{day}** — 💫 {summary.bonus_type}: {summary.bonus_description}"
+                line += f"\n🎁 {summary.tribute_quantity} {summary.tribute_name}"
+                if summary.reward_kamas is not None:
+                    line += f" · 💰 {summary.reward_kamas:,}"
+                lines.append(line)
+            pages.append(discord.Embed(
+                title=f"🔎 Almanax — {text}",
+                description="\n\n".join(lines),
+                color=discord.Color.blue()
+            ))
 
-    @tasks.loop(seconds=60)
-    async def warning_loop(self):
-        """Send a warning message before the Almanax closes."""
-        now = datetime.now(timezone.utc) + timedelta(hours=1)  # Adjust UTC to UTC+1 (France)
-        closing_time = now.replace(hour=23, minute=59, second=0, microsecond=0)  # Almanax closes at 23:59
-        warning_time = closing_time - timedelta(hours=self.warning_hours)
+        if len(pages) == 1:
+            await ctx.send(embed=pages[0])
+            return
+        view = Paginator(ctx.author, pages)
+        view.message = await ctx.send(embed=pages[0], view=view)
 
-        if now >= warning_time and now < warning_time + timedelta(minutes=1):  # Trigger warning
-            await self.send_almanax_warning_message(now.strftime('%Y-%m-%d'))
+    def _almanax_time(self, day: date):
+        """The Almanax of a day is posted when it starts, at midnight."""
+        return paris_time(day)
 
-    async def send_almanax_message(self, channel, date: str, mention_role: bool = True):
+    def _almanax_end(self, day: date):
+        """A missed post is still sent until the day is over."""
+        return paris_time(day + timedelta(days=1))
+
+    def _prerender_time(self, day: date):
+        """The embeds of a day are ready a few minutes before it starts."""
+        return paris_time(day) - timedelta(minutes=PRERENDER_MINUTES)
+
+    def _prefetch_time(self, day: date):
+        """The calendar is topped up once a day, away from the midnight rush."""
+        return paris_time(day, 12)
+
+    def _closing_time(self, day: date):
+        """The Almanax closes at 23:59."""
+        return paris_time(day, 23, 59)
+
+    def _role_mention(self, guild, settings):
+        """Mention of the Almanax role of a guild, or None."""
+        if not settings.get("almanax_role"):
+            return None
+        role = discord.utils.get(guild.roles, name=settings["almanax_role"])
+        return role.mention if role else None
+
+    async def _deliver(self, channel, content=None, embed=None):
         """
-        Shared method to send an Almanax message for a given date.
+        Send a message of a daily post, at most SEND_CONCURRENCY at once.
+        Discord errors are retried with a growing pause, except the ones
+        a retry can't fix.
         """
-        if not channel:
+        async with self.send_semaphore:
+            for attempt in range(SEND_ATTEMPTS):
+                try:
+                    await channel.send(content, embed=embed)
+                    return
+                except (discord.Forbidden, discord.NotFound) as e:
+                    print(f"Error: Can't send to channel {channel.id}: {e}")
+                    return
+                except (discord.HTTPException, OSError) as e:
+                    if attempt == SEND_ATTEMPTS - 1:
+                        print(f"Error: Sending to channel {channel.id} failed: {e}")
+                        return
+                    await asyncio.sleep(SEND_BACKOFF * 2 ** attempt)
+
+    async def _fill_calendar(self, language, start: date, end: date):
+        """
+        Fetch the days from ``start`` to ``end`` missing from the calendar,
+        with one range call per RANGE_LIMIT days, and store them.
+        Callers hold the calendar lock of the language.
+        """
+        missing = self.calendar.missing(language, start, end)
+        if not missing:
             return
 
-        # Fetch Almanax data
-        with dofusdude.ApiClient(self.configuration) as api_client:
-            api_instance = dofusdude.AlmanaxApi(api_client)
-            language = self.selected_language
-
-            api_response = api_instance.get_almanax_date(language, date)
-            bonus_description = api_response.bonus.description
-            bonus_type = api_response.bonus.type.name
-            tribute_name = api_response.tribute.item.name
-            tribute_quantity = api_response.tribute.quantity
-            tribute_image_url = api_response.tribute.item.image_urls.sd
-            reward_kamas = api_response.reward_kamas
-
-            # Create the embed
-            embed = discord.Embed(
-                title=f"Almanax for {date}",
-                color=discord.Color.blue()
+        added = 0
+        first, last = missing[0], missing[-1]
+        while first <= last:
+            range_end = min(last, first + timedelta(days=RANGE_LIMIT - 1))
+            entries = await self.client.call(
+                "AlmanaxApi", "get_almanax_range", language,
+                range_from=first, range_to=range_end, range_size=-1,
+                timeout=RANGE_TIMEOUT, slow_call=RANGE_TIMEOUT
             )
-            embed.add_field(name=f"💫 {bonus_type}", value=bonus_description, inline=False)
-            embed.add_field(name="🎁 Tribute", value=f"{tribute_quantity} {tribute_name}", inline=True)
-            embed.add_field(name="💰 Reward Kamas", value=f"{reward_kamas:,}", inline=True)
-            embed.set_thumbnail(url=tribute_image_url)
-
-            # Send the message
-            if mention_role and self.almanax_role:
-                role = discord.utils.get(channel.guild.roles, name=self.almanax_role)
-                if role:
-                    await channel.send(f"{role.mention}", embed=embed)
-                    return
-            await channel.send(embed=embed)
+            added += self.calendar.update(language, entries or [])
+            first = range_end + timedelta(days=1)
 
-    async def send_almanax_warning_message(self, date: str):
-        """Send the warning message for the Almanax closing with i18n support."""
-        if not self.target_channel:
-            return
+        if added:
+            await asyncio.to_thread(self.calendar.save, language, self.calendar.payloads(language))
+
+    def _calendar_lock(self, language):
+        return self.calendar_locks.setdefault(language, asyncio.Lock())
+
+    async def get_almanax(self, language, day: date):
+        """
+        Almanax of a day from the calendar. A missing day is fetched with
+        the PREFETCH_DAYS after it, so the next lookups stay local.
+        """
+        entry = self.calendar.get(language, day)
+        if entry is None:
+            async with self._calendar_lock(language):
+                # Another lookup may have fetched it while we waited
+                if self.calendar.get(language, day) is None:
+                    await self._fill_calendar(language, day, day + timedelta(days=PREFETCH_DAYS - 1))
+            entry = self.calendar.get(language, day)
+        if entry is None:
+            raise ApiException(status=404, reason=f"No Almanax for {day.isoformat()}")
+        return entry
+
+    async def prefetch_calendar(self, day: date):
+        """Fetch the coming PREFETCH_DAYS of every language in use."""
+        languages = {self._language(guild_id) for guild_id, settings in self._subscribed()}
+        languages.add(self.selected_language)
+        for language in sorted(languages):
+            try:
+                async with self._calendar_lock(language):
+                    await self._fill_calendar(language, day, day + timedelta(days=PREFETCH_DAYS))
+            except ApiException as e:
+                print(f"Error: Almanax calendar ({language}) could not be prefetched: {e}")
+
+    async def _fetch_almanax(self, language, day: date):
+        """Almanax of a day, retried like the sends so a blip doesn't skip a day."""
+        for attempt in range(SEND_ATTEMPTS):
+            try:
+                return await self.get_almanax(language, day)
+            except ApiException:
+                if attempt == SEND_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(SEND_BACKOFF * 2 ** attempt)
+
+    async def _render_almanax(self, language, day: date):
+        """Embed of a day's Almanax in a language, None if it can't be fetched."""
+        date = day.isoformat()
+        embed = self.prerendered.get((date, language))
+        if embed is not None:
+            return embed
+        try:
+            embed = self.build_almanax_embed(await self._fetch_almanax(language, day), date)
+        except ApiException as e:
+            print(f"Error: Almanax {date} ({language}) could not be fetched: {e}")
+            return None
+        self.prerendered[(date, language)] = embed
+        return embed
+
+    async def prerender_almanax(self, day: date):
+        """
+        Fetch and render the Almanax of the day about to start in every
+        language in use, so a slow API can't delay the midnight post.
+        """
+        languages = {self._language(guild_id) for guild_id, settings in self._subscribed()}
+        await asyncio.gather(*(self._render_almanax(language, day) for language in languages))
 
+    async def post_almanax(self, day: date):
+        """
+        Send the Almanax of the day that just started to every subscribed
+        channel. Each language is fetched and rendered once, however many
+        guilds use it, and normally already was by prerender_almanax.
+        """
+        date = day.isoformat()
+        subscribed = self._subscribed()
+        # Read once: almanaxlang may change a guild's language during the fetch
+        guild_languages = {guild_id: self._language(guild_id) for guild_id, settings in subscribed}
+        languages = sorted(set(guild_languages.values()))
+
+        embeds = dict(zip(languages, await asyncio.gather(*(self._render_almanax(language, day) for language in languages))))
+        # Renders of past days are no longer needed
+        self.prerendered = {key: embed for key, embed in self.prerendered.items() if key[0] > date}
+
+        sends = []
+        for guild_id, settings in subscribed:
+            embed = embeds.get(guild_languages[guild_id])
+            channel = self.bot.get_channel(settings["target_channel"])
+            if embed is None:
+                continue
+            if not channel:
+                print(f"Error: Target channel with ID {settings['target_channel']} not found.")
+                continue
+            sends.append(self._deliver(channel, self._role_mention(channel.guild, settings), embed))
+        await asyncio.gather(*sends)
+
+    async def post_warning(self, day: date, hours: int):
+        """Warn the guilds closing ``hours`` from now that the Almanax will close."""
         # Translation dictionary
         translations = {
             "en": "⚠️ The Almanax will close in {hours} hour(s). Complete it soon!",
@@ -229,26 +507,59 @@ class Dofusalmanax(commands.Cog):
             "pt": "⚠️ O Almanax fechará em {hours} hora(s). Conclua em breve!"
         }
 
-        # Get the translation for the selected language or default to English
-        warning_message = translations.get(self.selected_language, translations["en"]).format(hours=self.warning_hours)
-
-        # Send the warning message
-        channel = self.bot.get_channel(self.target_channel)
-        if channel:
-            if self.almanax_role:
-                role = discord.utils.get(channel.guild.roles, name=self.almanax_role)
-                if role:
-                    await channel.send(f"{role.mention} {warning_message}")
-                else:
-                    await channel.send(warning_message)
-            else:
-                await channel.send(warning_message)
+        sends = []
+        for guild_id, settings in self._subscribed():
+            if settings.get("warning_hours") != hours:
+                continue
+            channel = self.bot.get_channel(settings["target_channel"])
+            if not channel:
+                continue
 
-    @almanax_loop.before_loop
-    @warning_loop.before_loop
-    async def before_loops(self):
-        """Wait until the bot is ready before starting the loops."""
-        await self.bot.wait_until_ready()
+            # Get the translation for the guild language or default to English
+            warning_message = translations.get(self._language(guild_id), translations["en"]).format(hours=hours)
+            mention = self._role_mention(channel.guild, settings)
+            if mention:
+                warning_message = f"{mention} {warning_message}"
+            sends.append(self._deliver(channel, warning_message))
+        await asyncio.gather(*sends)
+
+    def build_almanax_embed(self, api_response, date: str):
+        """Embed of the Almanax of a date."""
+        (
+            bonus_type, bonus_description, tribute_name,
+            tribute_quantity, tribute_image_url, reward_kamas
+        ) = AlmanaxSummary.from_entry(api_response)
+
+        # Create the embed
+        embed = discord.Embed(
+            title=f"Almanax for {date}",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name=f"💫 {bonus_type}", value=bonus_description, inline=False)
+        embed.add_field(name="🎁 Tribute", value=f"{tribute_quantity} {tribute_name}", inline=True)
+        embed.add_field(name="💰 Reward Kamas", value=f"{reward_kamas:,}", inline=True)
+        embed.set_thumbnail(url=tribute_image_url)
+        return embed
+
+    async def send_almanax_message(self, channel, date: str, mention_role: bool = True):
+        """
+        Shared method to send an Almanax message for a given date.
+        """
+        if not channel:
+            return
+
+        # Almanax data, from the calendar when already fetched
+        language = self._language(channel.guild)
+        api_response = await self.get_almanax(language, datetime.strptime(date, '%Y-%m-%d').date())
+        embed = self.build_almanax_embed(api_response, date)
+
+        # Send the message
+        if mention_role:
+            mention = self._role_mention(channel.guild, self._settings(channel.guild))
+            if mention:
+                await channel.send(f"{mention}", embed=embed)
+                return
+        await channel.send(embed=embed)
 
 # Setup function to add the cog
 def setup(bot):
@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Awaitable, Callable, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+# The Almanax day starts and ends in French time
+PARIS = ZoneInfo("Europe/Paris")
+
+# Longest single sleep, so a suspended host or a clock change is noticed
+MAX_SLEEP = 60 * 60
+
+
+def paris_time(day: date, hour: int = 0, minute: int = 0) -> datetime:
+    """UTC instant of a wall clock time of an Almanax day."""
+    return datetime.combine(day, time(hour, minute), tzinfo=PARIS).astimezone(timezone.utc)
+
+
+def almanax_day(now: Optional[datetime] = None) -> date:
+    """The Almanax day running at ``now`` (default: right now)."""
+    return (now or datetime.now(timezone.utc)).astimezone(PARIS).date()
+
+
+class DailyJob(NamedTuple):
+    """
+    Something to run once per Almanax day.
+
+    ``at(day)`` gives the UTC instant it is due, or None to skip that day,
+    and ``until(day)`` how late it may still run after downtime.
+    """
+    name: str
+    at: Callable[[date], Optional[datetime]]
+    until: Callable[[date], datetime]
+    callback: Callable[[date], Awaitable[None]]
+
+
+class Scheduler:
+    """
+    Runs daily jobs at their exact time from a single task.
+
+    Jobs wait in a heap ordered by due time and the task sleeps until the
+    first one is due, instead of waking up every minute to compare clocks.
+    The last day each job ran for is saved in ``store`` (a Config value)
+    before it runs, so a job runs at most once per day, even across
+    restarts, and runs late if the bot was down when it was due. A new
+    job has nothing to catch up on: it starts at its next due time.
+    """
+
+    def __init__(self, store, ready: Optional[Callable[[], Awaitable[None]]] = None):
+        self.store = store
+        self.ready = ready
+        self.fired = {}  # job name -> ISO date of the last day it ran for
+        self._jobs = {}
+        self._versions = {}  # job name -> version of its live heap entry
+        self._heap = []  # (due, day, sequence, name, version)
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._running = set()
+        self._dirty = False  # fired changed without being saved
+
+    def __contains__(self, name):
+        return name in self._jobs
+
+    def names(self):
+        return list(self._jobs)
+
+    def add(self, job: DailyJob):
+        """Add a job, or replace the one with the same name."""
+        self._jobs[job.name] = job
+        self.reschedule(job.name)
+
+    def remove(self, name: str):
+        if self._jobs.pop(name, None) is not None:
+            # Its heap entry no longer matches and gets dropped
+            self._versions[name] += 1
+            # Added again later, it starts over as a new job
+            if self.fired.pop(name, None) is not None:
+                self._dirty = True
+            self._wakeup.set()
+
+    def reschedule(self, name: str):
+        """Recompute when a job is next due, after its settings changed."""
+        job = self._jobs[name]
+        version = self._versions.get(name, 0) + 1
+        self._versions[name] = version
+
+        now = datetime.now(timezone.utc)
+        if job.name not in self.fired:
+            self._start(job, now)
+        due = self._next(job, now)
+        if due is not None:
+            self._sequence += 1
+            heapq.heappush(self._heap, (*due, self._sequence, name, version))
+        self._wakeup.set()
+
+    def _start(self, job: DailyJob, now: datetime):
+        """
+        Count a new job as run up to the day before its next due time,
+        so it doesn't fire at once for a time that already passed.
+        """
+        today = almanax_day(now)
+        for offset in range(-1, 3):
+            day = today + timedelta(days=offset)
+            due = job.at(day)
+            if due is not None and due > now:
+                self.fired[job.name] = (day - timedelta(days=1)).isoformat()
+                self._dirty = True
+                return
+
+    def _next(self, job: DailyJob, now: datetime):
+        """(due, day) of the first day the job still has to run for."""
+        last = self.fired.get(job.name)
+        today = almanax_day(now)
+        for offset in range(-1, 3):
+            day = today + timedelta(days=offset)
+            if last is not None and day.isoformat() <= last:
+                continue
+            due = job.at(day)
+            if due is None or job.until(day) < now:
+                continue
+            return due, day
+        return None
+
+    async def start(self):
+        self.fired = dict(await self.store())
+        for name in self._jobs:
+            self.reschedule(name)
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._running:
+            task.cancel()
+
+    async def _run(self):
+        if self.ready is not None:
+            await self.ready()
+
+        while True:
+            if self._dirty:
+                self._dirty = False
+                await self.store.set(self.fired)
+
+            # Entries of rescheduled jobs are dropped lazily
+            while self._heap and (self._heap[0][3] not in self._jobs or self._heap[0][-1] != self._versions[self._heap[0][3]]):
+                heapq.heappop(self._heap)
+
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            due, day, sequence, name, version = self._heap[0]
+            delay = (due - datetime.now(timezone.utc)).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            job = self._jobs[name]
+            # Saved before running: a crash mid-send must not send twice
+            self.fired[name] = day.isoformat()
+            self._dirty = False
+            await self.store.set(self.fired)
+            self.reschedule(name)
+
+            # A slow job must not hold back the others
+            task = asyncio.create_task(self._fire(job, day))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, job: DailyJob, day: date):
+        try:
+            await job.callback(day)
+        except Exception as e:
+            print(f"Error running {job.name} for {day}: {e}")
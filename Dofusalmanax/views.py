@@ -0,0 +1,55 @@
+import discord
+
+
+class Paginator(discord.ui.View):
+    """
+    Pages through a list of embeds with buttons.
+
+    Only the author of the command can turn the pages; the buttons are
+    disabled after ``timeout`` seconds without use.
+    """
+
+    def __init__(self, author, pages, timeout: float = 120):
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.pages = pages
+        self.current_page = 0
+        self.message = None
+        self._refresh()
+
+    def _refresh(self):
+        """Point the buttons at the current page."""
+        single_page = len(self.pages) == 1
+        self.previous.disabled = single_page
+        self.next.disabled = single_page
+        self.counter.label = f"{self.current_page + 1}/{len(self.pages)}"
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return interaction.user == self.author
+
+    async def _show_page(self, interaction, page):
+        self.current_page = page % len(self.pages)
+        self._refresh()
+        await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
+
+    @discord.ui.button(label="⬅", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction, button):
+        await self._show_page(interaction, self.current_page - 1)
+
+    @discord.ui.button(label="1/1", style=discord.ButtonStyle.secondary, disabled=True)
+    async def counter(self, interaction, button):
+        pass
+
+    @discord.ui.button(label="➡", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction, button):
+        await self._show_page(interaction, self.current_page + 1)
+
+    async def on_timeout(self):
+        """Grey out the buttons."""
+        for child in self.children:
+            child.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+# Largest image accepted from the CDN
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+
+
+class ArtworkStore:
+    """
+    Content-addressed on-disk copy of the item artwork.
+
+    Files are named after the SHA-256 of their bytes, so an image shared
+    by several items or URLs is stored once, and ``manifest.json`` maps
+    every downloaded URL to its file. Beyond ``max_bytes`` the least
+    recently used files are deleted.
+
+    Downloads run in the background and are shared by every caller
+    waiting for the same URL; disk writes go to ``executor``.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, executor=None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.executor = executor
+        self._urls = {}  # url -> file name
+        self._files = OrderedDict()  # file name -> size, least recent first
+        self._downloads = {}  # url -> asyncio.Task
+        self._session = None
+        self.size = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return len(self._files)
+
+    def _load(self):
+        """Rebuild the LRU order from the files on disk."""
+        files = []
+        for path in self.directory.iterdir():
+            if path.suffix in IMAGE_SUFFIXES:
+                stat = path.stat()
+                files.append((stat.st_mtime, path.name, stat.st_size))
+        for mtime, name, size in sorted(files):
+            self._files[name] = size
+            self.size += size
+
+        try:
+            with open(self.directory / "manifest.json", encoding="utf-8") as f:
+                urls = json.load(f)
+        except (OSError, ValueError):
+            urls = {}
+        self._urls = {
+            url: name for url, name in urls.items() if name in self._files
+        }
+
+    def _save(self, urls: dict):
+        path = self.directory / "manifest.json"
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(urls, f)
+        os.replace(temporary, path)
+
+    def _write(self, name: str, data: bytes):
+        path = self.directory / name
+        if not path.exists():
+            temporary = path.with_suffix(".tmp")
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+
+    def _delete(self, names):
+        for name in names:
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    def path(self, url: str) -> Optional[Path]:
+        """Local copy of ``url`` if it was downloaded, without fetching it."""
+        name = self._urls.get(url)
+        if name is None or name not in self._files:
+            return None
+        self._files.move_to_end(name)
+        return self.directory / name
+
+    async def read(self, path: Path) -> bytes:
+        """
+        Bytes of a stored image. Raises OSError when another download
+        evicted it since it was returned.
+        """
+        return await self._run(path.read_bytes)
+
+    async def fetch(self, url: str) -> Optional[Path]:
+        """
+        Local copy of ``url``, downloading it first if needed.
+        Returns None when the image can't be downloaded. Cancelling the
+        caller doesn't cancel the download.
+        """
+        path = self.path(url)
+        if path is not None:
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        task = self._downloads.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download(url))
+            self._downloads[url] = task
+            task.add_done_callback(lambda t: self._downloads.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _download(self, url: str) -> Optional[Path]:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+        try:
+            async with self._session.get(url) as response:
+                response.raise_for_status()
+                if (response.content_length or 0) > MAX_IMAGE_BYTES:
+                    raise ValueError("image too large")
+                data = await response.content.read(MAX_IMAGE_BYTES + 1)
+                if len(data) > MAX_IMAGE_BYTES:
+                    raise ValueError("image too large")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            self.failures += 1
+            return None
+
+        suffix = Path(urlparse(url).path).suffix.lower()
+        if suffix not in IMAGE_SUFFIXES:
+            suffix = ".png"
+        name = hashlib.sha256(data).hexdigest() + suffix
+
+        await self._run(self._write, name, data)
+        if name not in self._files:
+            self._files[name] = len(data)
+            self.size += len(data)
+        self._files.move_to_end(name)
+        self._urls[url] = name
+        await self._evict()
+        await self._run(self._save, dict(self._urls))
+        return self.path(url)
+
+    async def _evict(self):
+        """Delete the least recently used files until under max_bytes."""
+        evicted = []
+        # The newest file stays even if it is over the limit on its own
+        while self.size > self.max_bytes and len(self._files) > 1:
+            name, size = self._files.popitem(last=False)
+            self.size -= size
+            evicted.append(name)
+        if evicted:
+            gone = set(evicted)
+            self._urls = {
+                url: name
+                for url, name in self._urls.items()
+                if name not in gone
+            }
+            await self._run(self._delete, evicted)
+
+    async def resize(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        await self._evict()
+        await self._run(self._save, dict(self._urls))
+
+    async def clear(self):
+        """Delete every stored image."""
+        names = list(self._files)
+        self._files.clear()
+        self._urls.clear()
+        self.size = 0
+        await self._run(self._delete, names)
+        await self._run(self._save, {})
+
+    async def close(self):
+        for task in list(self._downloads.values()):
+            task.cancel()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self._files),
+            "urls": len(self._urls),
+            "size": self.size,
+            "max_bytes": self.max_bytes,
+            "downloading": len(self._downloads),
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
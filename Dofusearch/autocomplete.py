@@ -0,0 +1,91 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Tuple
+
+
+class _WordKeys:
+    """
+    Sorted view of the word suffixes of the keys. Only (key, offset)
+    pairs are stored, each suffix is sliced when bisection reads it.
+    """
+
+    __slots__ = ("_keys", "_ids", "_offsets")
+
+    def __init__(self, keys, ids, offsets):
+        self._keys = keys
+        self._ids = ids
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, position):
+        return self._keys[self._ids[position]][self._offsets[position] :]
+
+
+class PrefixIndex:
+    """
+    Sorted arrays of the normalized names of one language, for prefix
+    lookups by bisection.
+
+    Names are matched on their start first, then on the start of any
+    later word, so "gelano" also finds "Anillo Gelano". Built once per
+    index sync and only read afterwards. Later words are stored as
+    offsets into the names instead of copies of their suffixes.
+    """
+
+    def __init__(self, names: Iterable[Tuple[str, str]]):
+        """``names`` yields (normalized key, display name) pairs."""
+        self._names = []
+        keys = []
+        words = []
+        for key, name in sorted(set(names)):
+            if not key:
+                continue
+            name_id = len(self._names)
+            self._names.append(name)
+            keys.append(key)
+            position = key.find(" ")
+            while position != -1:
+                words.append((name_id, position + 1))
+                position = key.find(" ", position + 1)
+        words.sort(key=lambda word: keys[word[0]][word[1] :])
+
+        self._keys = keys
+        self._word_ids = array("I", (name_id for name_id, offset in words))
+        self._word_keys = _WordKeys(
+            keys,
+            self._word_ids,
+            array("H", (offset for name_id, offset in words)),
+        )
+
+    def __len__(self):
+        return len(self._names)
+
+    def complete(self, prefix: str, limit: int = 25) -> List[str]:
+        """Display names whose normalized form starts with ``prefix``."""
+        if not prefix:
+            return self._names[:limit]
+
+        found = []
+        start = bisect_left(self._keys, prefix)
+        for name_id in range(start, len(self._keys)):
+            if len(found) >= limit or not self._keys[name_id].startswith(
+                prefix
+            ):
+                break
+            found.append(name_id)
+
+        seen = set(found)
+        start = bisect_left(self._word_keys, prefix)
+        for position in range(start, len(self._word_keys)):
+            if len(found) >= limit or not self._word_keys[position].startswith(
+                prefix
+            ):
+                break
+            name_id = self._word_ids[position]
+            if name_id not in seen:
+                seen.add(name_id)
+                found.append(name_id)
+
+        return [self._names[name_id] for name_id in found]
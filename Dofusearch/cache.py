@@ -0,0 +1,100 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    ``get_or_load`` coalesces concurrent misses on the same key: the first
+    caller starts the loader and everybody else awaits that same task, so
+    one upstream call serves all of them.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> asyncio.Task
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Return a fresh cached value without loading it."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            # Expired entries stay until evicted, for get_stale
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def get_stale(self, key, default=None):
+        """Return a cached value even if it has expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        return entry[1]
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when no key is given."""
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+
+    async def get_or_load(self, key, loader):
+        """
+        Return the cached value for ``key``, calling ``loader()`` (a
+        coroutine function) on a miss. Errors are not cached.
+        """
+        marker = object()
+        value = self.get(key, marker)
+        if value is not marker:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._loaded(key, t))
+
+        # Shield so a cancelled caller doesn't cancel the shared load
+        return await asyncio.shield(task)
+
+    def _loaded(self, key, task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.set(key, task.result())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "hit_rate": (
+                (self.hits + self.coalesced) / lookups if lookups else 0.0
+            ),
+        }
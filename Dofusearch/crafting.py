@@ -0,0 +1,46 @@
+from typing import Dict, List, NamedTuple, Tuple
+
+# Recipe item_subtype -> search category of the ingredient
+RECIPE_CATEGORIES = {
+    "resources": "Resources",
+    "equipment": "Equipment",
+    "consumables": "Consumables",
+    "cosmetics": "Cosmetics",
+    "quest_items": "QuestItems",
+}
+
+
+class Craft(NamedTuple):
+    """
+    An item with its recipe expanded down to base resources.
+
+    ``ingredients`` holds (sub craft, quantity per unit) pairs and
+    ``materials`` maps (category, ankama_id) to (name, quantity per unit)
+    for every base resource of the whole tree. Sub crafts are shared
+    between every tree that uses them.
+    """
+
+    category: str
+    ankama_id: int
+    name: str
+    ingredients: List[Tuple["Craft", int]]
+    materials: Dict[Tuple[str, int], Tuple[str, int]]
+
+
+def combine_materials(ingredients) -> Dict[Tuple[str, int], Tuple[str, int]]:
+    """Total base resources of (craft, quantity) ingredients."""
+    totals = {}
+    for craft, quantity in ingredients:
+        for key, (name, count) in craft.materials.items():
+            previous = totals.get(key, (name, 0))[1]
+            totals[key] = (name, previous + count * quantity)
+    return totals
+
+
+def tree_lines(craft: Craft, amount: int = 1, depth: int = 0) -> List[str]:
+    """Indented "- N× name" lines of a crafting tree."""
+    lines = []
+    for ingredient, quantity in craft.ingredients:
+        lines.append(f"{'  ' * depth}- {quantity * amount}× {ingredient.name}")
+        lines.extend(tree_lines(ingredient, quantity * amount, depth + 1))
+    return lines
@@ -2,33 +2,159 @@ import dofusdude
 import discord
 import os
 import asyncio
-import unicodedata
-import i18n
+import json
+import re
+import time
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from discord import app_commands
+from discord.ext import tasks
 from dofusdude.rest import ApiException
 from redbot.core import commands, checks, Config
+from redbot.core.data_manager import cog_data_path
+
+from .api import DofusDudeClient
+from .artwork import ArtworkStore
+from .autocomplete import PrefixIndex
+from .cache import TTLCache
+from .crafting import Craft, RECIPE_CATEGORIES, combine_materials, tree_lines
+from .embeds import add_lines_field, fit_pages
+from .filters import EffectIndex, parse_query
+from .fuzzy import FuzzyMatcher
+from .index import CATALOGUES, ItemIndex, catalogue_entries
+from .limiter import FairLimiter
+from .locales import Locales
+from .memory import deep_sizeof, format_size
+from .sets import SetGraph, SetMember, bonus_table
+from .utils import normalize_name
+from .views import BatchView, Paginator, ViewRegistry, attachments
 
 current_directory = os.path.dirname(os.path.abspath(__file__))
 locales_path = os.path.join(current_directory, "locales")
-i18n.load_path.append(locales_path)
-i18n.set("locale", "es")
-i18n.set("file_format", "json")
-i18n.set("filename_format", "{locale}.{format}")
-i18n.set("enable_memoization", True)
-_ = i18n.t
 
 
-def remove_accents(input_str: str) -> str:
-    # Removes all accent/diacritic marks from the given string
-    # and returns the normalized version (e.g., "á" -> "a").
-    nf = unicodedata.normalize("NFD", input_str)
-    return "".join(ch for ch in nf if unicodedata.category(ch) != "Mn")
+# Categories are searched concurrently, but the first one in this list
+# with an exact match wins.
+SEARCH_METHODS = [
+    ("MountsApi", "get_mounts_search", "Mounts"),  # Search logic done
+    (
+        "ConsumablesApi",
+        "get_items_consumables_search",
+        "Consumables",
+    ),  # Search logic done
+    (
+        "EquipmentApi",
+        "get_items_equipment_search",
+        "Equipment",
+    ),  # Search logic done
+    (
+        "CosmeticsApi",
+        "get_cosmetics_search",
+        "Cosmetics",
+    ),  # Search logic done
+    (
+        "ResourcesApi",
+        "get_items_resource_search",
+        "Resources",
+    ),  # Search logic done
+    (
+        "QuestItemsApi",
+        "get_items_quest_search",
+        "QuestItems",
+    ),  # Search logic done
+    ("SetsApi", "get_sets_search", "Sets"),  # Search logic done
+]
+
+# Category -> (api class, method) returning the detailed payload
+DETAIL_METHODS = {
+    "Mounts": ("MountsApi", "get_mounts_single"),
+    "Consumables": ("ConsumablesApi", "get_items_consumables_single"),
+    "Equipment": ("EquipmentApi", "get_items_equipment_single"),
+    "Cosmetics": ("CosmeticsApi", "get_cosmetics_single"),
+    "Resources": ("ResourcesApi", "get_items_resources_single"),
+    "QuestItems": ("QuestItemsApi", "get_item_quest_single"),
+    "Sets": ("SetsApi", "get_sets_single"),
+}
+
+# Category -> dofusdude model the detail endpoint returns, used to load
+# details from the catalogue snapshot
+SNAPSHOT_MODELS = {
+    "Mounts": "Mount",
+    "Consumables": "Resource",
+    "Equipment": "Weapon",
+    "Cosmetics": "Equipment",
+    "Resources": "Resource",
+    "QuestItems": "Resource",
+    "Sets": "EquipmentSet",
+}
+
+# Category -> locale key of the error shown when its details can't be fetched
+ERROR_MESSAGES = {
+    "Mounts": "messages.error.mount",
+    "Consumables": "messages.error.consumable",
+    "Equipment": "messages.error.equipment",
+    "Cosmetics": "messages.error.cosmetic",
+    "Resources": "messages.error.resource",
+    "QuestItems": "messages.error.questitem",
+    "Sets": "messages.error.set",
+}
+
+SUPPORTED_LANGUAGES = ["en", "es", "fr", "de", "pt"]
+GAME = "dofus3"
+
+# Catalogue sync: entries per page, page downloads at once, how old a
+# catalogue may get before it is downloaded again, and how long a page
+# may take (it doesn't count as a slow call for the breaker below that)
+SYNC_PAGE_SIZE = 500
+SYNC_CONCURRENCY = 4
+SYNC_INTERVAL = 24 * 60 * 60
+SYNC_TIMEOUT = 60
+
+# dofusearchbatch limits: names per message, lookups at once, lines per page
+BATCH_LIMIT = 30
+BATCH_CONCURRENCY = 5
+BATCH_PAGE_SIZE = 10
+
+# Default budget of the searches that miss the index (each one queries
+# every category), in searches per second and burst size, for the whole
+# bot and for each guild, and how long a search may wait for its turn
+SEARCH_RATE = 50
+SEARCH_BURST = 200
+GUILD_SEARCH_RATE = 20
+GUILD_SEARCH_BURST = 60
+LIMITER_WAIT = 30
+
+# Seconds a paginator may sit unused before its buttons are disabled
+VIEW_IDLE = 120
+
+# dofuscraft limits: item details fetched at once per tree, recipe levels
+# expanded before the deeper ingredients count as raw materials, and the
+# largest amount that can be asked for
+CRAFT_CONCURRENCY = 5
+CRAFT_MAX_DEPTH = 8
+CRAFT_MAX_AMOUNT = 10000
+
+# Artwork cache: where images are served from ("off" keeps the CDN URLs),
+# how long a result waits for its images before falling back to the CDN,
+# and the default disk budget in MB
+ARTWORK_MODES = ("off", "attach", "url")
+ARTWORK_WAIT = 2
+ARTWORK_MAX_SIZE = 256
+
+
+def type_name(item):
+    """Type name of an API model or an IndexedItem."""
+    item_type_obj = getattr(item, "type", None)
+    return getattr(item_type_obj, "name", None) or getattr(
+        item, "type_name", None
+    )
 
 
 class Dofusearch(commands.Cog):
     """
     A cog to fetch item data using the Dofus Dude API.
 
-    This cog allows you to search for items, mounts, consumables, equipment, resources, quest items and sets (sets WIP).
+    This cog allows you to search for items, mounts, consumables, equipment, resources, quest items and sets.
     """
 
     def __init__(self, bot):
@@ -39,486 +165,1596 @@ class Dofusearch(commands.Cog):
         self.config = Config.get_conf(
             self, identifier=47294758274, force_registration=True
         )
-        self.config.register_global(selected_language="es")  # Default to 'es'
+        self.config.register_global(
+            selected_language="es",  # Default to 'es'
+            pool_size=10,  # Kept-alive connections to the Dofus Dude API
+            artwork_mode="off",  # One of ARTWORK_MODES
+            artwork_base_url=None,  # Serves the artwork folder in "url" mode
+            artwork_max_size=ARTWORK_MAX_SIZE,  # MB
+            # API search budget, see SEARCH_RATE
+            search_rate=SEARCH_RATE,
+            search_burst=SEARCH_BURST,
+            guild_search_rate=GUILD_SEARCH_RATE,
+            guild_search_burst=GUILD_SEARCH_BURST,
+            # Game data version the snapshot was last checked against
+            data_version=None,
+        )
+        self.config.register_guild(selected_language=None)  # None => global
         self.selected_language = "es"  # Default value
+        # Guild id -> language, so commands never await Config for it
+        self.guild_languages = {}
+        # Every locale bundle, loaded once
+        self.locales = Locales(locales_path)
+        # Every Dofus Dude call goes through this async client,
+        # created in cog_load and closed in cog_unload
+        self.client = None
+        # Local blocking work (index writes, matcher builds)
+        self.executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="dofusearch"
+        )
+        self.index = ItemIndex(cog_data_path(self) / "items.sqlite3")
+        # Detailed payloads keyed by (game, language, category, ankama_id)
+        self.detail_cache = TTLCache(maxsize=2048, ttl=6 * 60 * 60)
+        # Finished embed dicts keyed by (data version, language, category,
+        # ankama_id); the version bump drops every stale render at once
+        self.render_cache = TTLCache(maxsize=1024, ttl=24 * 60 * 60)
+        # Sets with their resolved items, keyed by (game, language, set id)
+        self.set_cache = TTLCache(maxsize=256, ttl=6 * 60 * 60)
+        # Complete recipe trees keyed by (game, language, category,
+        # ankama_id), shared by every tree using them as an ingredient
+        self.craft_cache = TTLCache(maxsize=2048, ttl=6 * 60 * 60)
+        self.data_version = None
+        # Results served stale while the API was down, re-rendered by
+        # refresh_loop: (language, category, ankama_id) -> _render args
+        self.stale_renders = {}
+        # Language -> FuzzyMatcher built from the local index
+        self.matchers = {}
+        # Language -> PrefixIndex answering slash command autocomplete
+        self.prefixes = {}
+        # Language -> EffectIndex answering dofusfilter
+        self.effect_indexes = {}
+        # Budget of the API searches, shared fairly between guilds
+        self.limiter = FairLimiter(
+            SEARCH_RATE, SEARCH_BURST, GUILD_SEARCH_RATE, GUILD_SEARCH_BURST
+        )
+        # API searches in flight, keyed by (game, language, name)
+        self.searches = {}
+        self.coalesced_searches = 0
+        # Every open paginator, expired by view_loop
+        self.views = ViewRegistry(idle=VIEW_IDLE)
+        # Local copy of the item artwork, created in cog_load
+        self.artwork = None
+        self.artwork_mode = "off"
+        self.artwork_base_url = None
 
     async def cog_load(self):
-        """Load the stored language when the cog is loaded."""
+        """Load the stored settings and open the API client."""
         self.selected_language = await self.config.selected_language()
+        # A version change while the bot was down must still be noticed
+        self.data_version = await self.config.data_version()
+        self.guild_languages = {
+            guild_id: data["selected_language"]
+            for guild_id, data in (await self.config.all_guilds()).items()
+            if data.get("selected_language")
+        }
+        self.client = DofusDudeClient(
+            self.configuration, pool_size=await self.config.pool_size()
+        )
+        self.client.start_monitor()
+        self.limiter.configure(
+            await self.config.search_rate(),
+            await self.config.search_burst(),
+            await self.config.guild_search_rate(),
+            await self.config.guild_search_burst(),
+        )
+
+        self.artwork_mode = await self.config.artwork_mode()
+        self.artwork_base_url = await self.config.artwork_base_url()
+        self.artwork = ArtworkStore(
+            cog_data_path(self) / "artwork",
+            await self.config.artwork_max_size() * 1024 * 1024,
+            executor=self.executor,
+        )
+
+        # Start the loops once the client exists
+        self.index_loop.start()
+        self.version_loop.start()
+        self.view_loop.start()
+        self.refresh_loop.start()
+
+    async def cog_unload(self):
+        """Stop the loops and drop pending lookups when the cog is unloaded."""
+        self.index_loop.cancel()
+        self.version_loop.cancel()
+        self.view_loop.cancel()
+        self.refresh_loop.cancel()
+        await self.views.close()
+        self.limiter.close()
+        if self.artwork:
+            await self.artwork.close()
+        if self.client:
+            self.client.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.index.close()
+
+    @tasks.loop(hours=1)
+    async def index_loop(self):
+        """
+        Sync the catalogues of every language into the local item index.
+        Catalogues younger than SYNC_INTERVAL are left alone.
+        """
+        semaphore = asyncio.Semaphore(SYNC_CONCURRENCY)
+        jobs = [
+            (language, catalogue)
+            for language in SUPPORTED_LANGUAGES
+            for catalogue in CATALOGUES
+        ]
+        changes = await asyncio.gather(
+            *(
+                self._sync_catalogue(semaphore, language, *catalogue)
+                for language, catalogue in jobs
+            )
+        )
+
+        changed_languages = {
+            language
+            for (language, catalogue), changed in zip(jobs, changes)
+            if changed
+        }
+        for language in SUPPORTED_LANGUAGES:
+            if language in changed_languages:
+                await self._build_lookups(language)
+        if changed_languages:
+            # Details and renders were built from the previous snapshot
+            self._invalidate_caches()
+
+    async def _sync_catalogue(
+        self, semaphore, language, api_class, method, fields, category
+    ):
+        """
+        Download one catalogue page by page and write the differences to
+        the index. Returns True when any row changed.
+        """
+        updated_at = self.index.updated_at(language, category)
+        if updated_at and time.time() - updated_at < SYNC_INTERVAL:
+            return False
+
+        entries = []
+        page_number = 1
+        while True:
+            async with semaphore:
+                try:
+                    api_response = await self.client.call(
+                        api_class,
+                        method,
+                        game=GAME,
+                        language=language,
+                        page_size=SYNC_PAGE_SIZE,
+                        page_number=page_number,
+                        timeout=SYNC_TIMEOUT,
+                        slow_call=SYNC_TIMEOUT,
+                        **fields,
+                    )
+                except ApiException as e:
+                    # Keep the previous snapshot rather than a partial one
+                    print(f"Error indexing {category} ({language}): {e}")
+                    return False
+
+            page = catalogue_entries(api_response)
+            entries.extend(page)
+            # The API may cap the page size, only the next link tells
+            # whether pages are left
+            links = getattr(api_response, "links", None)
+            if not page or not getattr(links, "next", None):
+                break
+            page_number += 1
+
+        loop = asyncio.get_running_loop()
+        changes = await loop.run_in_executor(
+            self.executor,
+            self.index.sync_catalogue,
+            language,
+            category,
+            entries,
+        )
+        if changes is None:
+            print(
+                f"Error indexing {category} ({language}): no entries, "
+                "keeping the previous snapshot"
+            )
+            return False
+        written, deleted = changes
+        return bool(written or deleted)
+
+    @tasks.loop(minutes=30)
+    async def version_loop(self):
+        """
+        Drop cached details and renders when the game data changes, and
+        sync the catalogue snapshot again right away.
+        """
+        try:
+            version = await self.client.call(
+                "MetaApi", "get_meta_version", game=GAME
+            )
+        except ApiException:
+            return
+
+        data_version = getattr(version, "version", None)
+        if data_version and data_version != self.data_version:
+            if self.data_version is not None:
+                self._invalidate_caches()
+                # Details come from the snapshot, which is outdated too
+                await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.index.mark_stale
+                )
+                self.index_loop.restart()
+            self.data_version = data_version
+            await self.config.data_version.set(data_version)
+
+    def _invalidate_caches(self):
+        """Drop every cached detail, set, recipe and render."""
+        self.detail_cache.invalidate()
+        self.set_cache.invalidate()
+        self.craft_cache.invalidate()
+        self.render_cache.invalidate()
+
+    @tasks.loop(seconds=15)
+    async def view_loop(self):
+        """Disable the paginators nobody used for VIEW_IDLE seconds."""
+        await self.views.sweep()
+
+    @tasks.loop(minutes=1)
+    async def refresh_loop(self):
+        """Re-render the results served stale, once the API answers again."""
+        while self.stale_renders:
+            stale_key, args = next(iter(self.stale_renders.items()))
+            try:
+                pages = await self._load_render(*args)
+            except ApiException:
+                # Still down (or the breaker is open), retry next time
+                return
+            self.stale_renders.pop(stale_key, None)
+            self.render_cache.set((self.data_version, *stale_key), pages)
+
+    @version_loop.before_loop
+    async def before_version_loop(self):
+        """Wait until the bot is ready before starting the loop."""
+        await self.bot.wait_until_ready()
+
+    @index_loop.before_loop
+    async def before_index_loop(self):
+        """Wait until the bot is ready before starting the loop."""
+        await self.bot.wait_until_ready()
+        # Warm up from the last snapshot, the sync only touches what changed
+        for language in SUPPORTED_LANGUAGES:
+            await self._build_lookups(language)
+
+    async def _build_lookups(self, language):
+        """
+        (Re)build the fuzzy matcher, the autocomplete prefix index and the
+        equipment effect index of a language from the index.
+        """
+        loop = asyncio.get_running_loop()
+        names = await loop.run_in_executor(
+            self.executor, self.index.names, language
+        )
+        if names:
+            self.matchers[language] = await loop.run_in_executor(
+                self.executor, FuzzyMatcher, names
+            )
+            self.prefixes[language] = await loop.run_in_executor(
+                self.executor, PrefixIndex, names
+            )
+        equipment = await loop.run_in_executor(
+            self.executor, self.index.entries, language, "Equipment"
+        )
+        if equipment:
+            self.effect_indexes[language] = await loop.run_in_executor(
+                self.executor, EffectIndex, equipment
+            )
+
+    def _language(self, guild):
+        """Search language of a guild (global default outside guilds)."""
+        if guild is None:
+            return self.selected_language
+        return self.guild_languages.get(guild.id, self.selected_language)
+
+    def _lookup_index(self, language, name):
+        """
+        Answer a search from the local index.
+        Returns (category, item) like _search, or None on a miss. A hit is
+        only trusted when every higher priority catalogue was synced,
+        since an unsynced one might hold the item the API would return.
+        """
+        rows = self.index.exact(language, name)
+        if not rows:
+            return None
+        synced = self.index.synced(language)
+        for api_class, method, category in SEARCH_METHODS:
+            matching_items = [row for row in rows if row.category == category]
+            if matching_items:
+                return category, max(matching_items, key=lambda x: x.level or 0)
+            if category not in synced:
+                return None
+        return None
 
     @commands.guildowner()
     @commands.command()
     async def searchlang(self, ctx, language: str):
         """
-        Change the search language. Available languages: en, es, fr, de, pt
+        Change the search language of this server. Available languages: en, es, fr, de, pt
         """
-        supported_languages = ["en", "es", "fr", "de", "pt"]
-        if language in supported_languages:
-            await self.config.selected_language.set(language)
-            self.selected_language = language
+        if language in SUPPORTED_LANGUAGES:
+            if ctx.guild:
+                await self.config.guild(ctx.guild).selected_language.set(
+                    language
+                )
+                self.guild_languages[ctx.guild.id] = language
+            else:
+                await self.config.selected_language.set(language)
+                self.selected_language = language
             await ctx.send(f"Changed language to {language}")
         else:
             await ctx.send(
                 "Language not supported. Supported languages: en, es, fr, de, pt"
             )
 
+    async def _get_detail(self, category, game, language, ankama_id):
+        """
+        Fetch the detailed payload of an item through the detail cache.
+        Concurrent requests for the same item share one upstream call.
+        """
+        api_class, method = DETAIL_METHODS[category]
+
+        async def load():
+            # The catalogue snapshot already holds most details
+            model = SNAPSHOT_MODELS.get(category)
+            if model and game == GAME:
+                payload = self.index.payload(language, category, ankama_id)
+                if payload and category == "Sets":
+                    # Set list entries call the highest item level "level"
+                    data = json.loads(payload)
+                    data.setdefault(
+                        "highest_equipment_level", data.get("level")
+                    )
+                    data["effects"] = data.get("effects") or {}
+                    return dofusdude.EquipmentSet.from_dict(data)
+                if payload:
+                    return getattr(dofusdude, model).from_json(payload)
+
+            return await self.client.call(
+                api_class,
+                method,
+                game=game,
+                language=language,
+                ankama_id=ankama_id,
+            )
+
+        key = (game, language, category, ankama_id)
+        return await self.detail_cache.get_or_load(key, load)
+
+    async def _get_set(self, game, language, set_id):
+        """
+        Fetch a set and every item in it through the set cache.
+        The items are fetched in parallel, from the snapshot when possible;
+        items that can't be fetched are left out.
+        """
+
+        async def load():
+            equipment_set = await self._get_detail(
+                "Sets", game, language, set_id
+            )
+            categories = ["Equipment", "Cosmetics"]
+            if getattr(equipment_set, "contains_cosmetics_only", False):
+                categories.reverse()
+
+            async def resolve(ankama_id):
+                # Set items are equipment or cosmetics, the snapshot knows which
+                category = next(
+                    (
+                        category
+                        for category in categories
+                        if self.index.payload(language, category, ankama_id)
+                    ),
+                    categories[0],
+                )
+                item = await self._get_detail(
+                    category, game, language, ankama_id
+                )
+                return SetMember(category, item)
+
+            members = await asyncio.gather(
+                *(
+                    resolve(ankama_id)
+                    for ankama_id in equipment_set.equipment_ids or []
+                ),
+                return_exceptions=True,
+            )
+            # A member the API can't serve is left out, anything else is a bug
+            for member in members:
+                if isinstance(member, BaseException) and not isinstance(
+                    member, ApiException
+                ):
+                    raise member
+            return SetGraph(
+                equipment_set,
+                [
+                    member
+                    for member in members
+                    if not isinstance(member, ApiException)
+                ],
+            )
+
+        return await self.set_cache.get_or_load((game, language, set_id), load)
+
+    async def _get_craft(self, game, language, category, ankama_id, semaphore):
+        """
+        Expand the recipe of an item down to base resources, through the
+        craft cache. Ingredients are expanded in parallel, at most
+        ``semaphore`` details being fetched at once.
+        """
+        craft, complete = await self._expand_craft(
+            game, language, category, ankama_id, semaphore, ()
+        )
+        return craft
+
+    async def _expand_craft(
+        self, game, language, category, ankama_id, semaphore, path
+    ):
+        """
+        Return (craft, complete) for an item reached through ``path``.
+        A tree cut short by a cycle or by CRAFT_MAX_DEPTH depends on that
+        path, so only complete trees are cached. Loads are not shared while
+        in flight: two trees of a recipe cycle would wait on each other.
+        """
+        key = (game, language, category, ankama_id)
+        craft = self.craft_cache.get(key)
+        if craft is not None:
+            self.craft_cache.hits += 1
+            return craft, True
+        self.craft_cache.misses += 1
+
+        # Only the fetch holds the semaphore, never the wait for the
+        # ingredients, so deep trees can't starve it
+        async with semaphore:
+            item = await self._get_detail(category, game, language, ankama_id)
+        name = getattr(item, "name", None) or str(ankama_id)
+
+        item_path = path + ((category, ankama_id),)
+        entries = getattr(item, "recipe", None) or []
+        complete = True
+        recipe = []
+        if entries and len(item_path) > CRAFT_MAX_DEPTH:
+            # Deeper ingredients count as raw materials
+            complete = False
+            entries = []
+        for entry in entries:
+            entry_key = (
+                RECIPE_CATEGORIES.get(entry.item_subtype, "Resources"),
+                entry.item_ankama_id,
+            )
+            if entry.item_ankama_id is None:
+                continue
+            # A recipe needing its own result would never end
+            if entry_key in item_path:
+                complete = False
+                continue
+            recipe.append((entry_key, entry.quantity or 1))
+
+        expanded = await asyncio.gather(
+            *(
+                self._expand_craft(
+                    game, language, *entry_key, semaphore, item_path
+                )
+                for entry_key, quantity in recipe
+            )
+        )
+        ingredients = []
+        for (craft, sub_complete), (entry_key, quantity) in zip(
+            expanded, recipe
+        ):
+            ingredients.append((craft, quantity))
+            complete = complete and sub_complete
+        if ingredients:
+            materials = combine_materials(ingredients)
+        else:
+            materials = {(category, ankama_id): (name, 1)}
+
+        craft = Craft(category, ankama_id, name, ingredients, materials)
+        if complete:
+            self.craft_cache.set(key, craft)
+        return craft, complete
+
+    async def _search_category(self, api_class, method, game, language, name):
+        """
+        Run a single category search.
+        Returns the highest level item whose name matches, or None.
+        """
+        try:
+            api_response = await self.client.call(
+                api_class, method, game=game, language=language, query=name
+            )
+        except TypeError:
+            return None
+        except ApiException as e:
+            # A client error means no results, outages must not look like one
+            if e.status and 400 <= e.status < 500 and e.status != 429:
+                return None
+            raise
+
+        if not isinstance(api_response, list):
+            return None
+
+        matching_items = [
+            item
+            for item in api_response
+            if normalize_name(getattr(item, "name", "")) == name
+        ]
+        if not matching_items:
+            return None
+
+        # Keep the item with the highest level
+        return max(matching_items, key=lambda x: getattr(x, "level", 0) or 0)
+
+    async def _search(self, game, language, name):
+        """
+        Query every category at once and return (category, item) for the
+        first category in SEARCH_METHODS order that has an exact match.
+        Lower priority lookups still in flight are cancelled.
+        Raises ApiException when a category could not be searched before
+        any match was found.
+        """
+        tasks = [
+            asyncio.create_task(
+                self._search_category(api_class, method, game, language, name)
+            )
+            for api_class, method, category in SEARCH_METHODS
+        ]
+        try:
+            # Await in priority order so a faster low priority hit
+            # never wins over a higher priority category. A category that
+            # fails raises: it might have held the right item.
+            for (api_class, method, category), task in zip(
+                SEARCH_METHODS, tasks
+            ):
+                item = await task
+                if item is not None:
+                    return category, item
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Collect the lookups that already failed, or their errors
+            # get logged as never retrieved
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @commands.is_owner()
+    @commands.command()
+    async def dofuscache(self, ctx):
+        """
+        Show the hit/miss counters of the item detail and render caches.
+        """
+        stats = self.detail_cache.stats()
+        set_stats = self.set_cache.stats()
+        craft_stats = self.craft_cache.stats()
+        render_stats = self.render_cache.stats()
+        await ctx.send(
+            f"Detail cache: {stats['size']}/{stats['maxsize']} entries\n"
+            f"Hits: {stats['hits']} | Misses: {stats['misses']} | "
+            f"Coalesced: {stats['coalesced']} | In flight: {stats['inflight']}\n"
+            f"Hit rate: {stats['hit_rate']:.1%}\n"
+            f"Set cache: {set_stats['size']}/{set_stats['maxsize']} sets, "
+            f"hit rate {set_stats['hit_rate']:.1%}\n"
+            f"Craft cache: {craft_stats['size']}/{craft_stats['maxsize']} "
+            f"recipes, hit rate {craft_stats['hit_rate']:.1%}\n"
+            f"Render cache: {render_stats['size']}/{render_stats['maxsize']} "
+            f"entries, hit rate {render_stats['hit_rate']:.1%} "
+            f"(data version {self.data_version or 'unknown'})"
+        )
+
+    @commands.is_owner()
+    @commands.command()
+    async def dofuspool(self, ctx, size: int):
+        """
+        Set how many connections to the Dofus Dude API are kept alive.
+        """
+        if size < 1:
+            await ctx.send("Pool size must be at least 1.")
+            return
+
+        await self.config.pool_size.set(size)
+        old_client = self.client
+        self.client = DofusDudeClient(self.configuration, pool_size=size)
+        self.client.start_monitor()
+        if old_client:
+            old_client.close()
+        await ctx.send(f"Connection pool size set to {size}.")
+
+    @commands.is_owner()
     @commands.command()
-    @commands.cooldown(10, 10, commands.BucketType.guild)
-    @commands.max_concurrency(10, commands.BucketType.default)
+    async def dofuslimit(
+        self,
+        ctx,
+        rate: float,
+        burst: int,
+        guild_rate: float,
+        guild_burst: int,
+    ):
+        """
+        Set the budget of the searches sent to the Dofus Dude API.
+        In searches per second and burst size, for the whole bot and then
+        for each server. Searches answered by the local index are free.
+        """
+        if min(rate, burst, guild_rate, guild_burst) <= 0:
+            await ctx.send("Every budget must be above 0.")
+            return
+
+        await self.config.search_rate.set(rate)
+        await self.config.search_burst.set(burst)
+        await self.config.guild_search_rate.set(guild_rate)
+        await self.config.guild_search_burst.set(guild_burst)
+        self.limiter.configure(rate, burst, guild_rate, guild_burst)
+        await ctx.send(
+            f"Search budget set to {rate:g}/s (burst {burst}), "
+            f"{guild_rate:g}/s (burst {guild_burst}) per server."
+        )
+
+    @commands.is_owner()
+    @commands.command()
+    async def dofusmemory(self, ctx):
+        """
+        Show how much memory the in-memory lookups and caches take.
+        """
+
+        def measure():
+            # Shared strings are counted once, in the first structure
+            seen = set()
+            rows = []
+            for language in SUPPORTED_LANGUAGES:
+                structures = (
+                    self.prefixes.get(language),
+                    self.matchers.get(language),
+                    self.effect_indexes.get(language),
+                )
+                rows.append(
+                    (
+                        language,
+                        len(structures[0] or ()),
+                        len(structures[2] or ()),
+                        *(
+                            deep_sizeof(structure, seen) if structure else 0
+                            for structure in structures
+                        ),
+                    )
+                )
+            caches = [
+                (name, len(cache), deep_sizeof(cache, seen))
+                for name, cache in (
+                    ("Detail cache", self.detail_cache),
+                    ("Set cache", self.set_cache),
+                    ("Craft cache", self.craft_cache),
+                    ("Render cache", self.render_cache),
+                )
+            ]
+            return rows, caches
+
+        loop = asyncio.get_running_loop()
+        rows, caches = await loop.run_in_executor(self.executor, measure)
+
+        lines = ["Lang  Names  Equip  Prefix     Fuzzy      Effects"]
+        total = 0
+        for language, names, equipment, *sizes in rows:
+            total += sum(sizes)
+            lines.append(
+                f"{language:<5} {names:<6} {equipment:<6} "
+                + " ".join(f"{format_size(size):<10}" for size in sizes)
+            )
+        for name, entries, size in caches:
+            total += size
+            lines.append(f"{name}: {entries} entries, {format_size(size)}")
+        lines.append(f"Total: {format_size(total)}")
+        try:
+            index_size = os.path.getsize(cog_data_path(self) / "items.sqlite3")
+            lines.append(f"Index file on disk: {format_size(index_size)}")
+        except OSError:
+            pass
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
+    @commands.is_owner()
+    @commands.command()
+    async def dofusapi(self, ctx):
+        """
+        Show the Dofus Dude client counters, the circuit breaker state, the
+        search limiter and the event loop lag.
+        """
+        stats = self.client.stats()
+        breaker = self.client.breaker.stats()
+        limiter = self.limiter.stats()
+        retry = ""
+        if breaker["retry_in"]:
+            retry = f" (retry in {breaker['retry_in']:.0f} s)"
+        await ctx.send(
+            f"Pool size: {stats['pool_size']} | "
+            f"API calls: {stats['calls']} | Errors: {stats['errors']} | "
+            f"Timeouts: {stats['timeouts']} | In flight: {stats['inflight']}\n"
+            f"Average call: {stats['avg_call'] * 1000:.0f} ms\n"
+            f"Event loop lag: {stats['loop_lag'] * 1000:.1f} ms "
+            f"(max {stats['loop_lag_max'] * 1000:.1f} ms, "
+            f"blocked {stats['loop_blocked']:.2f} s in total)\n"
+            f"Circuit breaker: {breaker['state']}{retry} | "
+            f"Failure rate: {breaker['failure_rate']:.0%} | "
+            f"Slow calls: {breaker['slow_rate']:.0%}\n"
+            f"Opened: {breaker['opened']} times | "
+            f"Rejected calls: {breaker['rejected']} | "
+            f"Stale results to refresh: {len(self.stale_renders)}\n"
+            f"Search limiter: {limiter['tokens']:.0f}/"
+            f"{limiter['capacity']:.0f} searches | "
+            f"Queued: {limiter['queued']} "
+            f"({limiter['guilds_waiting']} guilds) | "
+            f"Average wait: {limiter['avg_wait'] * 1000:.0f} ms "
+            f"(max {limiter['max_wait'] * 1000:.0f} ms) | "
+            f"Coalesced searches: {self.coalesced_searches}"
+        )
+
+    @commands.is_owner()
+    @commands.group(invoke_without_command=True)
+    async def dofusartwork(self, ctx):
+        """
+        Show the local artwork cache settings and counters.
+        """
+        stats = self.artwork.stats()
+        await ctx.send(
+            f"Mode: {self.artwork_mode} | "
+            f"Base URL: {self.artwork_base_url or 'not set'}\n"
+            f"Folder: {self.artwork.directory}\n"
+            f"Stored: {stats['files']} images, {format_size(stats['size'])}"
+            f"/{format_size(stats['max_bytes'])} | "
+            f"Downloading: {stats['downloading']}\n"
+            f"Hits: {stats['hits']} | Misses: {stats['misses']} | "
+            f"Failed downloads: {stats['failures']} | "
+            f"Hit rate: {stats['hit_rate']:.1%}"
+        )
+
+    @dofusartwork.command(name="mode")
+    async def dofusartwork_mode(self, ctx, mode: str):
+        """
+        Choose how artwork is sent: off, attach or url.
+        off links the Dofus Dude CDN, attach uploads the local copy with
+        every message, url links the local copy through the base URL.
+        """
+        mode = mode.lower()
+        if mode not in ARTWORK_MODES:
+            await ctx.send(
+                f"Unknown mode. Choose one of: {', '.join(ARTWORK_MODES)}"
+            )
+            return
+        if mode == "url" and not self.artwork_base_url:
+            await ctx.send("Set a base URL first with `dofusartwork baseurl`.")
+            return
+
+        await self.config.artwork_mode.set(mode)
+        self.artwork_mode = mode
+        await ctx.send(f"Artwork mode set to {mode}.")
+
+    @dofusartwork.command(name="baseurl")
+    async def dofusartwork_baseurl(self, ctx, base_url: str):
+        """
+        Set the public URL of the artwork folder, for the url mode.
+        Any web server publishing the folder shown by `dofusartwork` works.
+        """
+        if not base_url.startswith(("http://", "https://")):
+            await ctx.send("The base URL must start with http:// or https://.")
+            return
+
+        base_url = base_url.rstrip("/")
+        await self.config.artwork_base_url.set(base_url)
+        self.artwork_base_url = base_url
+        await ctx.send(f"Artwork base URL set to {base_url}.")
+
+    @dofusartwork.command(name="size")
+    async def dofusartwork_size(self, ctx, megabytes: int):
+        """
+        Set how much disk space the artwork cache may use, in MB.
+        """
+        if megabytes < 1:
+            await ctx.send("Size must be at least 1 MB.")
+            return
+
+        await self.config.artwork_max_size.set(megabytes)
+        await self.artwork.resize(megabytes * 1024 * 1024)
+        await ctx.send(f"Artwork cache size set to {megabytes} MB.")
+
+    @dofusartwork.command(name="clear")
+    async def dofusartwork_clear(self, ctx):
+        """
+        Delete every stored image.
+        """
+        await self.artwork.clear()
+        await ctx.send("Artwork cache cleared.")
+
+    @commands.hybrid_command()
+    @commands.cooldown(5, 10, commands.BucketType.user)
     @checks.bot_has_permissions(attach_files=True)
+    @app_commands.describe(name="Name of the item to search")
     async def dofusearch(self, ctx, *, name: str):
         """
         Search for an item, mount, consumable, equipment, resource, quest item or set.
-        If the name is not equal to the item's name, the search will fail.
+        If the name is not equal to the item's name, the search will fail
+        and the closest names will be suggested instead.
         Its not case sentitive and accepts accents.
         """
-        name = remove_accents(name).lower()
-
-        search_methods = [
-            ("MountsApi", "get_mounts_search", "Mounts"),  # Search logic done
-            (
-                "ConsumablesApi",
-                "get_items_consumables_search",
-                "Consumables",
-            ),  # Search logic done
-            (
-                "EquipmentApi",
-                "get_items_equipment_search",
-                "Equipment",
-            ),  # Search logic done
-            (
-                "CosmeticsApi",
-                "get_cosmetics_search",
-                "Cosmetics",
-            ),  # Search logic done
-            (
-                "ResourcesApi",
-                "get_items_resource_search",
-                "Resources",
-            ),  # Search logic done
-            (
-                "QuestItemsApi",
-                "get_items_quest_search",
-                "QuestItems",
-            ),  # Search logic done
-            ("SetsApi", "get_sets_search", "Sets"),  # TODO
+        # Slash commands must be answered within 3 seconds, API misses
+        # can take longer
+        await ctx.defer()
+        name = normalize_name(name)
+
+        language = self._language(ctx.guild)
+        _ = self.locales.translator(language)
+        game = GAME
+
+        try:
+            results = await self._resolve(
+                game, language, name, guild_id=getattr(ctx.guild, "id", None)
+            )
+        except ApiException:
+            await ctx.send(_("messages.error.unavailable"))
+            return
+
+        if not results:
+            message = _("messages.info.not_found")
+            matcher = self.matchers.get(language)
+            suggestions = matcher.suggest(name) if matcher else []
+            if suggestions:
+                message += "\n" + _("messages.info.did_you_mean")
+                message += "\n" + "\n".join(f"- {s}" for s in suggestions)
+            await ctx.send(message)
+            return
+
+        category, matched_item = results
+        await self._send_result(ctx, game, language, category, matched_item)
+
+    @dofusearch.autocomplete("name")
+    async def dofusearch_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ):
+        """Suggest item names from memory, never from the API."""
+        prefixes = self.prefixes.get(self._language(interaction.guild))
+        if prefixes is None:
+            return []
+        return [
+            app_commands.Choice(name=name[:100], value=name[:100])
+            for name in prefixes.complete(normalize_name(current))
         ]
 
-        results = None
+    @commands.command()
+    @commands.cooldown(2, 30, commands.BucketType.guild)
+    async def dofusearchbatch(self, ctx, *, names: str):
+        """
+        Search several items at once.
+        Separate the names with commas or new lines (up to 30 names).
+        Pick an item in the menu to see its details.
+        """
+        language = self._language(ctx.guild)
+        _ = self.locales.translator(language)
+        game = GAME
+
+        # Normalize and drop duplicates, keeping the original order
+        queries = list(
+            dict.fromkeys(
+                normalize_name(query.strip())
+                for query in re.split(r"[,\n]", names)
+                if query.strip()
+            )
+        )[:BATCH_LIMIT]
 
-        with dofusdude.ApiClient(self.configuration) as api_client:
-            language = self.selected_language
-            game = "dofus3"
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        guild_id = getattr(ctx.guild, "id", None)
 
-            # STEP 2: Search for other categories (general logic)
-            for api_class, method, category in search_methods:
+        async def resolve(query):
+            async with semaphore:
                 try:
-                    api_instance = getattr(dofusdude, api_class)(api_client)
-                    search_method = getattr(api_instance, method)
-
-                    if asyncio.iscoroutinefunction(search_method):
-                        api_response = await search_method(
-                            game=game, language=language, query=name
-                        )
-                    else:
-                        api_response = search_method(
-                            game=game, language=language, query=name
-                        )
-
-                    if isinstance(api_response, list):
-                        matching_items = []
-                    for item in api_response:
-                        item_name_raw = getattr(item, "name", "")
-                        item_name_normalized = remove_accents(
-                            item_name_raw
-                        ).lower()
-                        if item_name_normalized == name:
-                            matching_items.append(item)
-
-                    # If there are matching items, find the one with the highest level
-                    if matching_items:
-                        # Sort items by level in descending order and take the first one
-                        highest_level_item = max(
-                            matching_items, key=lambda x: getattr(x, "level", 0)
-                        )
-                        results = (category, highest_level_item)
-                        break
-
-                except ApiException:
+                    return await self._resolve(
+                        game, language, query, guild_id=guild_id
+                    )
+                except ApiException as e:
+                    # An outage is not a miss, keep it apart
+                    return e
+
+        results = await asyncio.gather(*(resolve(q) for q in queries))
+        failed = [isinstance(result, ApiException) for result in results]
+
+        if not any(
+            result and not error for result, error in zip(results, failed)
+        ):
+            if any(failed):
+                await ctx.send(_("messages.error.unavailable"))
+            else:
+                await ctx.send(_("messages.info.not_found"))
+            return
+
+        pages = []
+        page_options = []
+        page_icons = []
+        for start in range(0, len(queries), BATCH_PAGE_SIZE):
+            lines = []
+            options = []
+            icon = None
+            for position in range(
+                start, min(start + BATCH_PAGE_SIZE, len(queries))
+            ):
+                if failed[position]:
+                    lines.append(f"`{position + 1}.` ⚠️ {queries[position]}")
                     continue
-                except TypeError:
+                if not results[position]:
+                    lines.append(f"`{position + 1}.` ❌ {queries[position]}")
                     continue
 
-        if not results:
-            await ctx.send(_("messages.info.not_found"))
+                category, item = results[position]
+                name = getattr(item, "name", None) or queries[position]
+                details = [category]
+                item_type_name = type_name(item)
+                if item_type_name:
+                    details.insert(0, item_type_name)
+                level = getattr(item, "level", None)
+                if level is not None:
+                    details.insert(0, f"{_('key_words.level')} {level}")
+                lines.append(
+                    f"`{position + 1}.` **{name}** — {' · '.join(details)}"
+                )
+                options.append((name, category, str(position)))
+                if icon is None and self.artwork_mode != "off":
+                    icon = self._icon_url(language, category, item)
+            if any(failed[start : start + BATCH_PAGE_SIZE]):
+                lines.append(f"\n⚠️ {_('messages.error.unavailable')}")
+
+            embed = discord.Embed(
+                title=_("messages.info.batch_title"),
+                description="\n".join(lines),
+                color=discord.Color.blurple(),
+            )
+            pages.append(embed)
+            page_options.append(options)
+            page_icons.append(icon)
+
+        for number, embed in enumerate(pages, start=1):
+            embed.set_footer(text=f"{number}/{len(pages)}")
+
+        async def show_details(position):
+            category, item = results[int(position)]
+            await self._send_result(ctx, game, language, category, item)
+
+        await self._send_batch(
+            ctx, language, pages, page_options, page_icons, show_details
+        )
+
+    @commands.command()
+    @commands.cooldown(5, 10, commands.BucketType.user)
+    async def dofusfilter(self, ctx, *, filters: str):
+        """
+        Find equipment by effects, level and type.
+        Separate the filters with commas, for example:
+        `wisdom >= 40, level 150-200, type ring, top 10`
+        Use the effect and type names of the search language.
+        """
+        language = self._language(ctx.guild)
+        _ = self.locales.translator(language)
+        game = GAME
+
+        effect_index = self.effect_indexes.get(language)
+        if effect_index is None:
+            await ctx.send(_("messages.error.filter_loading"))
             return
 
-        # Handle other categories (Resources, Consumables, etc.)
-        category, matched_item = results
-        ankama_id = getattr(matched_item, "ankama_id", None)
+        try:
+            query = parse_query(
+                filters,
+                level_words={
+                    "level",
+                    "lvl",
+                    normalize_name(_("key_words.level")),
+                },
+                type_words={"type", normalize_name(_("key_words.type"))},
+            )
+        except ValueError as e:
+            await ctx.send(_("messages.error.filter_syntax").format(clause=e))
+            return
 
-        # ---------------------------
-        # IF MOUNTS => BUILD A SPECIAL EMBED
-        # ---------------------------
-        if category == "Mounts" and ankama_id is not None:
-            try:
-                mounts_api = dofusdude.MountsApi(api_client)
-                detailed_mount = mounts_api.get_mounts_single(
-                    game=game, language=language, ankama_id=ankama_id
+        effects = []
+        for effect_text, minimum in query.effects:
+            effect_key = effect_index.find_effect(effect_text)
+            if effect_key is None:
+                await ctx.send(
+                    _("messages.error.filter_effect").format(effect=effect_text)
                 )
+                return
+            effects.append((effect_key, minimum))
+
+        results = effect_index.search(
+            effects,
+            min_level=query.min_level,
+            max_level=query.max_level,
+            item_type=query.item_type,
+            limit=query.limit,
+        )
+        if not results:
+            await ctx.send(_("messages.info.not_found"))
+            return
 
-                # Now build an embed
-                mount_name = getattr(detailed_mount, "name", None)
-                mount_description = getattr(detailed_mount, "description", None)
-                image_urls = getattr(detailed_mount, "image_urls", None)
-                image_sd = (
-                    getattr(image_urls, "sd", None) if image_urls else None
+        pages = []
+        page_options = []
+        page_icons = []
+        for start in range(0, len(results), BATCH_PAGE_SIZE):
+            lines = []
+            options = []
+            icon = None
+            for position in range(
+                start, min(start + BATCH_PAGE_SIZE, len(results))
+            ):
+                item, rolls = results[position]
+                details = []
+                if item.level is not None:
+                    details.append(f"{_('key_words.level')} {item.level}")
+                if item.type_name:
+                    details.append(item.type_name)
+                for (effect_key, minimum), (low, high) in zip(effects, rolls):
+                    value = f"{low}–{high}" if low != high else str(high)
+                    details.append(
+                        f"{effect_index.effect_names[effect_key]} {value}"
+                    )
+                lines.append(
+                    f"`{position + 1}.` **{item.name}** — {' · '.join(details)}"
                 )
-                mount_effects = getattr(detailed_mount, "effects", None)
+                options.append((item.name, item.type_name, str(position)))
+                if icon is None and self.artwork_mode != "off":
+                    icon = self._icon_url(language, "Equipment", item)
 
-                embed_color = discord.Color.blurple()
-                embed = discord.Embed(
-                    title="", description="", color=embed_color
-                )
+            embed = discord.Embed(
+                title=_("messages.info.filter_title"),
+                description="\n".join(lines),
+                color=discord.Color.blurple(),
+            )
+            pages.append(embed)
+            page_options.append(options)
+            page_icons.append(icon)
 
-                # NAME => embed.title if not None
-                if mount_name:
-                    embed.title = mount_name
+        for number, embed in enumerate(pages, start=1):
+            embed.set_footer(text=f"{number}/{len(pages)}")
 
-                # DESCRIPTION => embed.description if not None
-                if mount_description:
-                    embed.description = mount_description
+        async def show_details(position):
+            item, rolls = results[int(position)]
+            await self._send_result(ctx, game, language, "Equipment", item)
 
-                # IMAGE => set image
-                if image_sd:
-                    embed.set_image(url=image_sd)
-
-                # EFFECTS => bullet list
-                if mount_effects:
-                    effect_lines = []
-                    for eff in mount_effects:
-                        # We only display the "formatted" text
-                        eff_formatted = getattr(eff, "formatted", None)
-                        if eff_formatted:
-                            effect_lines.append(f"- {eff_formatted}")
-                    if effect_lines:
-                        embed.add_field(
-                            name=_("key_words.effects"),
-                            value="\n".join(effect_lines),
-                            inline=False,
-                        )
-
-                await ctx.send(embed=embed)
-                return
+        await self._send_batch(
+            ctx, language, pages, page_options, page_icons, show_details
+        )
 
-            except ApiException as e:
-                await ctx.send(f"Error al obtener Montura detallado: {e}")
-                return
+    @commands.command()
+    @commands.cooldown(5, 10, commands.BucketType.user)
+    async def dofuscraft(self, ctx, amount: Optional[int] = 1, *, name: str):
+        """
+        Show the full crafting tree of an item and the raw materials it takes.
+        Start with a number to craft several at once, for example:
+        `10 Gelano`
+        """
+        name = normalize_name(name)
+        amount = max(1, min(CRAFT_MAX_AMOUNT, amount or 1))
 
-        # ---------------------------
-        # If category == "Resources" => get detailed resource & output JSON
-        # ---------------------------
-        if category == "Resources" and ankama_id is not None:
-            try:
-                resources_api = dofusdude.ResourcesApi(api_client)
-                # Fetch detailed resource data
-                detailed_resource = resources_api.get_items_resources_single(
-                    game=game, language=language, ankama_id=ankama_id
-                )
+        language = self._language(ctx.guild)
+        _ = self.locales.translator(language)
+        game = GAME
 
-                # Extract relevant fields
-                item_name = getattr(detailed_resource, "name", None)
-                item_description = getattr(
-                    detailed_resource, "description", None
-                )
-                item_type_obj = getattr(detailed_resource, "type", None)
-                item_type_name = (
-                    getattr(item_type_obj, "name", None)
-                    if item_type_obj
-                    else None
-                )
-                item_level = getattr(detailed_resource, "level", None)
-                item_pods = getattr(detailed_resource, "pods", None)
-                image_urls = getattr(detailed_resource, "image_urls", None)
-                image_sd = (
-                    getattr(image_urls, "sd", None) if image_urls else None
-                )
-                item_effects = getattr(detailed_resource, "effects", None)
+        try:
+            results = await self._resolve(
+                game, language, name, guild_id=getattr(ctx.guild, "id", None)
+            )
+        except ApiException:
+            await ctx.send(_("messages.error.unavailable"))
+            return
 
-                # Create the embed
-                embed_color = discord.Color.blurple()
-                embed = discord.Embed(
-                    title="", description="", color=embed_color
-                )
+        if not results:
+            await ctx.send(_("messages.info.not_found"))
+            return
+
+        category, matched_item = results
+        ankama_id = getattr(matched_item, "ankama_id", None)
+        if category not in RECIPE_CATEGORIES.values() or ankama_id is None:
+            await ctx.send(_("messages.info.no_recipe"))
+            return
+
+        try:
+            craft = await self._get_craft(
+                game,
+                language,
+                category,
+                ankama_id,
+                asyncio.Semaphore(CRAFT_CONCURRENCY),
+            )
+        except ApiException as e:
+            await ctx.send(f"{_(ERROR_MESSAGES[category])} {e}")
+            return
 
-                # Add title (name)
-                if item_name:
-                    embed.title = item_name
+        if not craft.ingredients:
+            await ctx.send(_("messages.info.no_recipe"))
+            return
 
-                # Add description
-                if item_description:
-                    embed.description = item_description
+        title = craft.name if amount == 1 else f"{amount}× {craft.name}"
 
-                # Add type name
-                if item_type_name:
-                    embed.add_field(
-                        name=_("key_words.type"),
-                        value=item_type_name,
-                        inline=True,
-                    )
+        # ---- PAGE 1 (Crafting tree) ----
+        page1 = discord.Embed(title=title, color=discord.Color.blurple())
+        add_lines_field(page1, _("key_words.recipe"), tree_lines(craft, amount))
 
-                # Add level
-                if item_level is not None:
-                    embed.add_field(
-                        name=_("key_words.level"),
-                        value=str(item_level),
-                        inline=True,
-                    )
+        # ---- PAGE 2 (Raw materials, most needed first) ----
+        page2 = discord.Embed(title=title, color=discord.Color.blurple())
+        materials = sorted(
+            craft.materials.values(),
+            key=lambda material: (-material[1], material[0]),
+        )
+        add_lines_field(
+            page2,
+            _("key_words.materials"),
+            [
+                f"- {count * amount}× {material}"
+                for material, count in materials
+            ],
+        )
+
+        image_urls = getattr(matched_item, "image_urls", None)
+        image_sd = getattr(image_urls, "sd", None) if image_urls else None
+        if image_sd:
+            page1.set_thumbnail(url=image_sd)
+            page2.set_thumbnail(url=image_sd)
+
+        await self._paginate(ctx, fit_pages([page1, page2]))
+
+    async def _resolve(self, game, language, name, guild_id=None):
+        """
+        Find the item matching a normalized name.
+        The local index answers most searches, the API only sees misses.
+        Returns (category, item) or None, raises ApiException when the API
+        is needed but unavailable.
+        """
+        results = self._lookup_index(language, name)
+        if not results:
+            results = await self._search_shared(game, language, name, guild_id)
+        return results
+
+    async def _search_shared(self, game, language, name, guild_id):
+        """
+        _search within the API budget of ``guild_id``.
+        Identical searches in flight share a single set of upstream calls.
+        """
+        key = (game, language, name)
+        task = self.searches.get(key)
+        if task is not None:
+            self.coalesced_searches += 1
+        else:
 
-                # Add pods
-                if item_pods is not None:
-                    embed.add_field(
-                        name=_("key_words.pods"),
-                        value=str(item_pods),
-                        inline=True,
+            async def search():
+                try:
+                    await asyncio.wait_for(
+                        self.limiter.acquire(guild_id),
+                        LIMITER_WAIT,
                     )
+                except asyncio.TimeoutError:
+                    raise ApiException(status=429, reason="Too many searches")
+                return await self._search(game, language, name)
 
-                # Add effects
-                if item_effects:
-                    effect_lines = []
-                    for eff in item_effects:
-                        eff_formatted = getattr(eff, "formatted", None)
-                        if eff_formatted:
-                            effect_lines.append(f"- {eff_formatted}")
-                    if effect_lines:
-                        embed.add_field(
-                            name=_("key_words.effects"),
-                            value="\n".join(effect_lines),
-                            inline=False,
-                        )
-
-                # Add image
-                if image_sd:
-                    embed.set_image(url=image_sd)
+            task = asyncio.ensure_future(search())
+            self.searches[key] = task
+            task.add_done_callback(lambda t: self.searches.pop(key, None))
 
-                # Send the embed
-                await ctx.send(embed=embed)
-                return
+        # Shield so a cancelled caller doesn't cancel the shared search
+        return await asyncio.shield(task)
 
-            except ApiException as e:
-                await ctx.send(f"Error al obtener Recurso detallado: {e}")
-                return
+    async def _send_result(self, ctx, game, language, category, matched_item):
+        """
+        Send the embed(s) of a search result.
+        """
+        _ = self.locales.translator(language)
+        try:
+            pages = await self._render(game, language, category, matched_item)
+        except ApiException as e:
+            await ctx.send(f"{_(ERROR_MESSAGES[category])} {e}")
+            return
+        await self._paginate(ctx, pages)
+
+    async def _render(self, game, language, category, matched_item):
+        """
+        Return the embed pages of a search result, from the render cache
+        when possible. While the API is down, an expired render is served
+        marked as stale and refreshed later by refresh_loop.
+        """
+        args = (game, language, category, matched_item)
+        ankama_id = getattr(matched_item, "ankama_id", None)
+        if ankama_id is None:
+            cached = await self._load_render(*args)
+            return [discord.Embed.from_dict(page) for page in cached]
+
+        key = (self.data_version, language, category, ankama_id)
+        try:
+            cached = await self.render_cache.get_or_load(
+                key, lambda: self._load_render(*args)
+            )
+        except ApiException:
+            cached = self.render_cache.get_stale(key)
+            if cached is None:
+                raise
+            self.stale_renders[(language, category, ankama_id)] = args
+            _ = self.locales.translator(language)
+            pages = [discord.Embed.from_dict(page) for page in cached]
+            for page in pages:
+                page.set_footer(text=_("messages.info.stale"))
+            return pages
+        return [discord.Embed.from_dict(page) for page in cached]
+
+    async def _load_render(self, game, language, category, matched_item):
+        """Build the pages of a search result as cacheable dicts."""
+        pages = fit_pages(
+            await self._build_pages(game, language, category, matched_item)
+        )
+        return [page.to_dict() for page in pages]
+
+    async def _build_pages(self, game, language, category, matched_item):
+        """
+        Fetch the details of a search result and build its embed pages.
+        """
+        _ = self.locales.translator(language)
+        # Handle other categories (Resources, Consumables, etc.)
+        ankama_id = getattr(matched_item, "ankama_id", None)
 
         # ---------------------------
-        # IF CONSUMABLES => BUILD A SPECIAL EMBED
+        # IF MOUNTS => BUILD A SPECIAL EMBED
         # ---------------------------
-        if category == "Consumables" and ankama_id is not None:
-            try:
-                consumables_api = dofusdude.ConsumablesApi(api_client)
-                # second call for detailed data
-                detailed_item = consumables_api.get_items_consumables_single(
-                    game=game, language=language, ankama_id=ankama_id
-                )
+        if category == "Mounts" and ankama_id is not None:
+            detailed_mount = await self._get_detail(
+                "Mounts", game, language, ankama_id
+            )
+
+            # Now build an embed
+            mount_name = getattr(detailed_mount, "name", None)
+            mount_description = getattr(detailed_mount, "description", None)
+            image_urls = getattr(detailed_mount, "image_urls", None)
+            image_sd = getattr(image_urls, "sd", None) if image_urls else None
+            mount_effects = getattr(detailed_mount, "effects", None)
+
+            embed_color = discord.Color.blurple()
+            embed = discord.Embed(title="", description="", color=embed_color)
+
+            # NAME => embed.title if not None
+            if mount_name:
+                embed.title = mount_name
+
+            # DESCRIPTION => embed.description if not None
+            if mount_description:
+                embed.description = mount_description
+
+            # IMAGE => set image
+            if image_sd:
+                embed.set_image(url=image_sd)
+
+            # EFFECTS => bullet list
+            if mount_effects:
+                effect_lines = []
+                for eff in mount_effects:
+                    # We only display the "formatted" text
+                    eff_formatted = getattr(eff, "formatted", None)
+                    if eff_formatted:
+                        effect_lines.append(f"- {eff_formatted}")
+                if effect_lines:
+                    add_lines_field(embed, _("key_words.effects"), effect_lines)
+
+            return [embed]
+
+        # ---------------------------
+        # If category == "Resources" => get detailed resource & output JSON
+        # ---------------------------
+        if category == "Resources" and ankama_id is not None:
+            # Fetch detailed resource data
+            detailed_resource = await self._get_detail(
+                "Resources", game, language, ankama_id
+            )
 
-                # Now build an embed
-                item_name = getattr(detailed_item, "name", None)
-                item_description = getattr(detailed_item, "description", None)
-                item_type_obj = getattr(detailed_item, "type", None)
-                item_type_name = (
-                    getattr(item_type_obj, "name", None)
-                    if item_type_obj
-                    else None
+            # Extract relevant fields
+            item_name = getattr(detailed_resource, "name", None)
+            item_description = getattr(detailed_resource, "description", None)
+            item_type_obj = getattr(detailed_resource, "type", None)
+            item_type_name = (
+                getattr(item_type_obj, "name", None) if item_type_obj else None
+            )
+            item_level = getattr(detailed_resource, "level", None)
+            item_pods = getattr(detailed_resource, "pods", None)
+            image_urls = getattr(detailed_resource, "image_urls", None)
+            image_sd = getattr(image_urls, "sd", None) if image_urls else None
+            item_effects = getattr(detailed_resource, "effects", None)
+
+            # Create the embed
+            embed_color = discord.Color.blurple()
+            embed = discord.Embed(title="", description="", color=embed_color)
+
+            # Add title (name)
+            if item_name:
+                embed.title = item_name
+
+            # Add description
+            if item_description:
+                embed.description = item_description
+
+            # Add type name
+            if item_type_name:
+                embed.add_field(
+                    name=_("key_words.type"),
+                    value=item_type_name,
+                    inline=True,
                 )
-                item_level = getattr(detailed_item, "level", None)
-                item_pods = getattr(
-                    detailed_item, "pods", None
-                )  # "weight inside the pocket"
-                image_urls = getattr(detailed_item, "image_urls", None)
-                image_sd = (
-                    getattr(image_urls, "sd", None) if image_urls else None
+
+            # Add level
+            if item_level is not None:
+                embed.add_field(
+                    name=_("key_words.level"),
+                    value=str(item_level),
+                    inline=True,
                 )
-                item_effects = getattr(detailed_item, "effects", None)
-                item_conditions = getattr(detailed_item, "conditions", None)
 
-                embed_color = discord.Color.blurple()
-                embed = discord.Embed(
-                    title="", description="", color=embed_color
+            # Add pods
+            if item_pods is not None:
+                embed.add_field(
+                    name=_("key_words.pods"),
+                    value=str(item_pods),
+                    inline=True,
                 )
 
-                # NAME => embed.title if not None
-                if item_name:
-                    embed.title = item_name
+            # Add effects
+            if item_effects:
+                effect_lines = []
+                for eff in item_effects:
+                    eff_formatted = getattr(eff, "formatted", None)
+                    if eff_formatted:
+                        effect_lines.append(f"- {eff_formatted}")
+                if effect_lines:
+                    add_lines_field(embed, _("key_words.effects"), effect_lines)
 
-                # DESCRIPTION => embed.description if not None
-                if item_description:
-                    embed.description = item_description
+            # Add image
+            if image_sd:
+                embed.set_image(url=image_sd)
 
-                # TYPE => field
-                if item_type_name:
-                    embed.add_field(
-                        name=_("key_words.type"),
-                        value=item_type_name,
-                        inline=True,
-                    )
+            return [embed]
 
-                # LEVEL => field
-                if item_level is not None:
-                    embed.add_field(
-                        name=_("key_words.level"),
-                        value=str(item_level),
-                        inline=True,
-                    )
+        # ---------------------------
+        # IF CONSUMABLES => BUILD A SPECIAL EMBED
+        # ---------------------------
+        if category == "Consumables" and ankama_id is not None:
+            # second call for detailed data
+            detailed_item = await self._get_detail(
+                "Consumables", game, language, ankama_id
+            )
 
-                # PODS => field
-                if item_pods is not None:
-                    embed.add_field(
-                        name=_("key_words.pods"),
-                        value=str(item_pods),
-                        inline=True,
-                    )
+            # Now build an embed
+            item_name = getattr(detailed_item, "name", None)
+            item_description = getattr(detailed_item, "description", None)
+            item_type_obj = getattr(detailed_item, "type", None)
+            item_type_name = (
+                getattr(item_type_obj, "name", None) if item_type_obj else None
+            )
+            item_level = getattr(detailed_item, "level", None)
+            item_pods = getattr(
+                detailed_item, "pods", None
+            )  # "weight inside the pocket"
+            image_urls = getattr(detailed_item, "image_urls", None)
+            image_sd = getattr(image_urls, "sd", None) if image_urls else None
+            item_effects = getattr(detailed_item, "effects", None)
+            item_conditions = getattr(detailed_item, "conditions", None)
+
+            embed_color = discord.Color.blurple()
+            embed = discord.Embed(title="", description="", color=embed_color)
+
+            # NAME => embed.title if not None
+            if item_name:
+                embed.title = item_name
+
+            # DESCRIPTION => embed.description if not None
+            if item_description:
+                embed.description = item_description
+
+            # TYPE => field
+            if item_type_name:
+                embed.add_field(
+                    name=_("key_words.type"),
+                    value=item_type_name,
+                    inline=True,
+                )
 
-                # IMAGE => set image
-                if image_sd:
-                    embed.set_image(url=image_sd)
-
-                # EFFECTS => bullet list
-                if item_effects:
-                    effect_lines = []
-                    for eff in item_effects:
-                        # We only display the "formatted" text
-                        eff_formatted = getattr(eff, "formatted", None)
-                        if eff_formatted:
-                            effect_lines.append(f"- {eff_formatted}")
-                    if effect_lines:
-                        embed.add_field(
-                            name=_("key_words.effects"),
-                            value="\n".join(effect_lines),
-                            inline=False,
-                        )
-
-                # CONDITIONS => field if not None
-                # Conditions can be a string or complex object.
-                # If your code has a single condition string, you can do:
-                if item_conditions:
-                    # For example, item_conditions might be a dict or an object
-                    # Check if it's a simple attribute like `.condition`
-                    # Or just do a naive approach:
-                    cond_text = str(item_conditions)
-                    embed.add_field(
-                        name=_("key_words.conditions"),
-                        value=cond_text,
-                        inline=False,
-                    )
+            # LEVEL => field
+            if item_level is not None:
+                embed.add_field(
+                    name=_("key_words.level"),
+                    value=str(item_level),
+                    inline=True,
+                )
 
-                await ctx.send(embed=embed)
-                return
+            # PODS => field
+            if item_pods is not None:
+                embed.add_field(
+                    name=_("key_words.pods"),
+                    value=str(item_pods),
+                    inline=True,
+                )
 
-            except ApiException as e:
-                await ctx.send(f"Error al obtener Consumible detallado: {e}")
-                return
+            # IMAGE => set image
+            if image_sd:
+                embed.set_image(url=image_sd)
+
+            # EFFECTS => bullet list
+            if item_effects:
+                effect_lines = []
+                for eff in item_effects:
+                    # We only display the "formatted" text
+                    eff_formatted = getattr(eff, "formatted", None)
+                    if eff_formatted:
+                        effect_lines.append(f"- {eff_formatted}")
+                if effect_lines:
+                    add_lines_field(embed, _("key_words.effects"), effect_lines)
+
+            # CONDITIONS => field if not None
+            # Conditions can be a string or complex object.
+            # If your code has a single condition string, you can do:
+            if item_conditions:
+                # For example, item_conditions might be a dict or an object
+                # Check if it's a simple attribute like `.condition`
+                # Or just do a naive approach:
+                cond_text = str(item_conditions)
+                embed.add_field(
+                    name=_("key_words.conditions"),
+                    value=cond_text,
+                    inline=False,
+                )
+
+            return [embed]
 
         # ---------------------------
         # If category == "QuestItems" => Get detailed quest item & build embed
         # ---------------------------
         if category == "QuestItems" and ankama_id is not None:
-            try:
-                quest_items_api = dofusdude.QuestItemsApi(api_client)
-                # Fetch detailed quest item data
-                detailed_quest_item = quest_items_api.get_item_quest_single(
-                    game=game, language=language, ankama_id=ankama_id
-                )
+            # Fetch detailed quest item data
+            detailed_quest_item = await self._get_detail(
+                "QuestItems", game, language, ankama_id
+            )
 
-                # Extract relevant fields
-                item_name = getattr(detailed_quest_item, "name", "Unknown")
-                item_description = getattr(
-                    detailed_quest_item, "description", None
-                )
-                item_type_obj = getattr(detailed_quest_item, "type", None)
-                item_type_name = (
-                    getattr(item_type_obj, "name", None)
-                    if item_type_obj
-                    else None
+            # Extract relevant fields
+            item_name = getattr(detailed_quest_item, "name", "Unknown")
+            item_description = getattr(detailed_quest_item, "description", None)
+            item_type_obj = getattr(detailed_quest_item, "type", None)
+            item_type_name = (
+                getattr(item_type_obj, "name", None) if item_type_obj else None
+            )
+            item_level = getattr(detailed_quest_item, "level", None)
+            item_pods = getattr(detailed_quest_item, "pods", None)
+            image_urls = getattr(detailed_quest_item, "image_urls", None)
+            image_sd = getattr(image_urls, "sd", None) if image_urls else None
+            item_effects = getattr(detailed_quest_item, "effects", None)
+            item_conditions = getattr(detailed_quest_item, "conditions", None)
+
+            # Build the embed
+            embed_color = discord.Color.blurple()
+            embed = discord.Embed(title=item_name, color=embed_color)
+
+            # Add description
+            if item_description:
+                embed.description = item_description
+
+            # Add type
+            if item_type_name:
+                embed.add_field(
+                    name=_("key_words.type"),
+                    value=item_type_name,
+                    inline=True,
                 )
-                item_level = getattr(detailed_quest_item, "level", None)
-                item_pods = getattr(detailed_quest_item, "pods", None)
-                image_urls = getattr(detailed_quest_item, "image_urls", None)
-                image_sd = (
-                    getattr(image_urls, "sd", None) if image_urls else None
+
+            # Add level
+            if item_level is not None:
+                embed.add_field(
+                    name=_("key_words.level"),
+                    value=str(item_level),
+                    inline=True,
                 )
-                item_effects = getattr(detailed_quest_item, "effects", None)
-                item_conditions = getattr(
-                    detailed_quest_item, "conditions", None
+
+            # Add pods
+            if item_pods is not None:
+                embed.add_field(
+                    name=_("key_words.pods"),
+                    value=str(item_pods),
+                    inline=True,
                 )
 
-                # Build the embed
-                embed_color = discord.Color.blurple()
-                embed = discord.Embed(title=item_name, color=embed_color)
+            # Add effects
+            if item_effects:
+                effect_lines = [
+                    f"- {effect.formatted}"
+                    for effect in item_effects
+                    if getattr(effect, "formatted", None)
+                ]
+                if effect_lines:
+                    add_lines_field(embed, _("key_words.effects"), effect_lines)
+
+            # Add conditions
+            if item_conditions:
+                # Assuming conditions are strings or have a "condition" attribute
+                conditions_text = getattr(
+                    item_conditions, "condition", None
+                ) or str(item_conditions)
+                embed.add_field(
+                    name=_("key_words.conditions"),
+                    value=conditions_text,
+                    inline=False,
+                )
 
-                # Add description
-                if item_description:
-                    embed.description = item_description
+            # Add image
+            if image_sd:
+                embed.set_image(url=image_sd)
 
-                # Add type
-                if item_type_name:
-                    embed.add_field(
-                        name=_("key_words.type"),
-                        value=item_type_name,
-                        inline=True,
-                    )
+            return [embed]
 
-                # Add level
-                if item_level is not None:
-                    embed.add_field(
-                        name=_("key_words.level"),
-                        value=str(item_level),
-                        inline=True,
-                    )
+        # ---------------------------
+        # IF SETS => ITEMS PAGE + BONUS PAGE
+        # ---------------------------
+        if category == "Sets" and ankama_id is not None:
+            graph = await self._get_set(game, language, ankama_id)
+            equipment_set = graph.equipment_set
+            set_name = getattr(equipment_set, "name", None) or getattr(
+                matched_item, "name", "Unknown"
+            )
+            set_level = getattr(equipment_set, "highest_equipment_level", None)
 
-                # Add pods
-                if item_pods is not None:
-                    embed.add_field(
-                        name=_("key_words.pods"),
-                        value=str(item_pods),
-                        inline=True,
-                    )
+            # ---- PAGE 1 (Items of the set) ----
+            page1 = discord.Embed(title=set_name, color=discord.Color.blurple())
 
-                # Add effects
-                if item_effects:
-                    effect_lines = [
-                        f"- {effect.formatted}"
-                        for effect in item_effects
-                        if getattr(effect, "formatted", None)
-                    ]
-                    if effect_lines:
-                        embed.add_field(
-                            name=_("key_words.effects"),
-                            value="\n".join(effect_lines),
-                            inline=False,
-                        )
-
-                # Add conditions
-                if item_conditions:
-                    # Assuming conditions are strings or have a "condition" attribute
-                    conditions_text = getattr(
-                        item_conditions, "condition", None
-                    ) or str(item_conditions)
-                    embed.add_field(
-                        name=_("key_words.conditions"),
-                        value=conditions_text,
-                        inline=False,
-                    )
+            if set_level is not None:
+                page1.add_field(
+                    name=_("key_words.level"), value=str(set_level), inline=True
+                )
 
-                # Add image
+            member_lines = []
+            for member in graph.members:
+                details = []
+                member_level = getattr(member.item, "level", None)
+                if member_level is not None:
+                    details.append(f"{_('key_words.level')} {member_level}")
+                member_type_name = type_name(member.item)
+                if member_type_name:
+                    details.append(member_type_name)
+                line = f"- **{getattr(member.item, 'name', 'Unknown')}**"
+                if details:
+                    line += f" — {' · '.join(details)}"
+                member_lines.append(line)
+            if member_lines:
+                add_lines_field(page1, _("key_words.set_items"), member_lines)
+
+            # Thumbnail => first item of the set
+            for member in graph.members:
+                image_urls = getattr(member.item, "image_urls", None)
+                image_sd = (
+                    getattr(image_urls, "sd", None) if image_urls else None
+                )
                 if image_sd:
-                    embed.set_image(url=image_sd)
+                    page1.set_thumbnail(url=image_sd)
+                    break
 
-                # Send the embed
-                await ctx.send(embed=embed)
-                return
+            pages = [page1]
 
-            except ApiException as e:
-                await ctx.send(f"Error al obtener Misión detallada: {e}")
-                return
+            # ---- PAGE 2 (Bonus per number of items worn) ----
+            bonuses = bonus_table(equipment_set)
+            if bonuses:
+                page2 = discord.Embed(
+                    title=set_name, color=discord.Color.blurple()
+                )
+                for count, lines in bonuses:
+                    add_lines_field(
+                        page2,
+                        _("key_words.set_bonus").format(count=count),
+                        lines,
+                    )
+                pages.append(page2)
+
+            return pages
 
         cosmetic_types = [
             _("cosmetic_types.wings"),
@@ -541,89 +1777,70 @@ class Dofusearch(commands.Cog):
         # If it's Equipment, fetch more details
         # ---------------------------
         if category == "Equipment" and ankama_id is not None:
-            try:
-                equipment_api = dofusdude.EquipmentApi(api_client)
-                matched_item = equipment_api.get_items_equipment_single(
-                    game=game, language=language, ankama_id=ankama_id
-                )
-            except ApiException:
-                await ctx.send(f"Error al obtener Equipamiento detallado: {e}")
-                pass
+            matched_item = await self._get_detail(
+                "Equipment", game, language, ankama_id
+            )
 
         # For all else (including equip with extra info now), we do pagination logic
         item_name = getattr(matched_item, "name", "Unknown")
-        item_type_obj = getattr(matched_item, "type", None)
-        item_type_name = getattr(item_type_obj, "name", None)
+        item_type_name = type_name(matched_item)
 
         if item_type_name in cosmetic_types:
             # Fetch detailed cosmetic data
-            try:
-                cosmetics_api = dofusdude.CosmeticsApi(api_client)
-                detailed_cosmetic = cosmetics_api.get_cosmetics_single(
-                    game=game, language=language, ankama_id=ankama_id
-                )
-
-                # Extract relevant fields
-                item_name = getattr(detailed_cosmetic, "name", "Desconocido")
-                item_description = getattr(
-                    detailed_cosmetic, "description", None
-                )
-                item_type_obj = getattr(detailed_cosmetic, "type", None)
-                item_type_name = getattr(item_type_obj, "name", None)
-                item_pods = getattr(detailed_cosmetic, "pods", None)
-                image_urls = getattr(detailed_cosmetic, "image_urls", None)
-                image_sd = (
-                    getattr(image_urls, "sd", None) if image_urls else None
-                )
-                parent_set = getattr(detailed_cosmetic, "parent_set", None)
-                parent_set_name = (
-                    getattr(parent_set, "name", None) if parent_set else None
-                )
-
-                # Build the embed for the cosmetic item
-                embed_color = discord.Color.blurple()
-                embed = discord.Embed(title=item_name, color=embed_color)
+            detailed_cosmetic = await self._get_detail(
+                "Cosmetics", game, language, ankama_id
+            )
 
-                # Add description
-                if item_description:
-                    embed.description = item_description
+            # Extract relevant fields
+            item_name = getattr(detailed_cosmetic, "name", "Desconocido")
+            item_description = getattr(detailed_cosmetic, "description", None)
+            item_type_obj = getattr(detailed_cosmetic, "type", None)
+            item_type_name = getattr(item_type_obj, "name", None)
+            item_pods = getattr(detailed_cosmetic, "pods", None)
+            image_urls = getattr(detailed_cosmetic, "image_urls", None)
+            image_sd = getattr(image_urls, "sd", None) if image_urls else None
+            parent_set = getattr(detailed_cosmetic, "parent_set", None)
+            parent_set_name = (
+                getattr(parent_set, "name", None) if parent_set else None
+            )
 
-                # Add type name
-                if item_type_name:
-                    embed.add_field(
-                        name=_("key_words.type"),
-                        value=item_type_name,
-                        inline=True,
-                    )
+            # Build the embed for the cosmetic item
+            embed_color = discord.Color.blurple()
+            embed = discord.Embed(title=item_name, color=embed_color)
 
-                # Add pods
-                if item_pods is not None:
-                    embed.add_field(
-                        name=_("key_words.pods"),
-                        value=str(item_pods),
-                        inline=True,
-                    )
+            # Add description
+            if item_description:
+                embed.description = item_description
 
-                # Add parent set
-                if parent_set_name:
-                    embed.add_field(
-                        name=_("key_words.cosmetic_set"),
-                        value=parent_set_name,
-                        inline=False,
-                    )
+            # Add type name
+            if item_type_name:
+                embed.add_field(
+                    name=_("key_words.type"),
+                    value=item_type_name,
+                    inline=True,
+                )
 
-                # Add image
-                if image_sd:
-                    embed.set_image(url=image_sd)
+            # Add pods
+            if item_pods is not None:
+                embed.add_field(
+                    name=_("key_words.pods"),
+                    value=str(item_pods),
+                    inline=True,
+                )
 
-                # Send the embed
-                await ctx.send(embed=embed)
+            # Add parent set
+            if parent_set_name:
+                embed.add_field(
+                    name=_("key_words.cosmetic_set"),
+                    value=parent_set_name,
+                    inline=False,
+                )
 
-                return
+            # Add image
+            if image_sd:
+                embed.set_image(url=image_sd)
 
-            except ApiException as e:
-                await ctx.send(f"Error al obtener datos del cosmético: {e}")
-                return
+            return [embed]
 
         item_description = getattr(matched_item, "description", None) or ""
         item_level = getattr(matched_item, "level", None)
@@ -665,11 +1882,7 @@ class Dofusearch(commands.Cog):
                 if eff_name and eff_formatted:
                     eff_lines.append(f"- **{eff_name}**: {eff_formatted}")
             if eff_lines:
-                page1.add_field(
-                    name=_("key_words.effects"),
-                    value="\n".join(eff_lines),
-                    inline=False,
-                )
+                add_lines_field(page1, _("key_words.effects"), eff_lines)
 
         # Stats
         stats_lines = []
@@ -720,49 +1933,152 @@ class Dofusearch(commands.Cog):
                 page2.set_image(url=image_url)
             pages = [page1, page2]
 
+        # ---- LAST PAGE (Bonus of the set the item belongs to) ----
+        parent_set_id = getattr(parent_set, "id", None) if parent_set else None
+        if parent_set_id is not None:
+            # The bonuses only need the set, not its items
+            try:
+                equipment_set = await self._get_detail(
+                    "Sets", game, language, parent_set_id
+                )
+            except ApiException:
+                # The item itself is still worth showing
+                equipment_set = None
+            bonuses = bonus_table(equipment_set) if equipment_set else []
+            if bonuses:
+                bonus_page = discord.Embed(
+                    title=getattr(equipment_set, "name", None)
+                    or parent_set_name,
+                    color=discord.Color.blurple(),
+                )
+                for count, lines in bonuses:
+                    add_lines_field(
+                        bonus_page,
+                        _("key_words.set_bonus").format(count=count),
+                        lines,
+                    )
+                pages.append(bonus_page)
+
+        return pages
+
+    async def _paginate(self, ctx, pages):
+        """Send a list of embeds, with buttons to page through them."""
+        page_files = await self._local_artwork(pages)
+        files = attachments(page_files[0])
+
         # If single page, just send it
         if len(pages) == 1:
-            await ctx.send(embed=pages[0])
+            await ctx.send(embed=pages[0], files=files or None)
             return
 
-        # Otherwise, reaction-based pagination for 2 pages
-        current_page = 0
-        message = await ctx.send(embed=pages[current_page])
-        await message.add_reaction("⬅")
-        await message.add_reaction("➡")
+        view = Paginator(
+            ctx.author, pages, page_files if any(page_files) else None
+        )
+        self.views.add(view)
+        view.message = await ctx.send(
+            embed=pages[0], view=view, files=files or None
+        )
 
-        def check(reaction, user):
-            return (
-                user == ctx.author
-                and reaction.message.id == message.id
-                and str(reaction.emoji) in ["⬅", "➡"]
-            )
+    async def _send_batch(
+        self, ctx, language, pages, page_options, page_icons, on_select
+    ):
+        """
+        Send compact result pages with a select menu to open each result.
+        With the artwork cache on, every page shows the small artwork of
+        its first result.
+        """
+        _ = self.locales.translator(language)
+        if self.artwork_mode != "off":
+            for embed, icon in zip(pages, page_icons):
+                if icon:
+                    embed.set_thumbnail(url=icon)
+        page_files = await self._local_artwork(pages)
+        files = attachments(page_files[0])
+
+        view = BatchView(
+            ctx.author,
+            pages,
+            page_options,
+            on_select,
+            placeholder=_("messages.info.batch_select"),
+            page_files=page_files if any(page_files) else None,
+        )
+        self.views.add(view)
+        view.message = await ctx.send(
+            embed=pages[0], view=view, files=files or None
+        )
 
-        while True:
+    async def _local_artwork(self, pages):
+        """
+        Point the images of ``pages`` at the local artwork cache.
+        Returns the (file name, bytes) of the images every page shows,
+        which must be attached to the message in "attach" mode. They are
+        read right away, since another download may evict the files.
+        Images not downloaded within ARTWORK_WAIT, or evicted before they
+        could be read, keep their CDN URL.
+        """
+        page_files = [[] for page in pages]
+        mode = self.artwork_mode
+        if mode == "off" or (mode == "url" and not self.artwork_base_url):
+            return page_files
+
+        async def fetch(url):
             try:
-                reaction, user = await self.bot.wait_for(
-                    "reaction_add", timeout=60.0, check=check
+                path = await asyncio.wait_for(
+                    self.artwork.fetch(url), ARTWORK_WAIT
                 )
-                # Try removing their reaction if possible
-                try:
-                    await message.remove_reaction(reaction.emoji, user)
-                except discord.Forbidden:
-                    pass
-
-                if str(reaction.emoji) == "➡":
-                    current_page = (current_page + 1) % len(pages)
-                elif str(reaction.emoji) == "⬅":
-                    current_page = (current_page - 1) % len(pages)
-
-                await message.edit(embed=pages[current_page])
-
             except asyncio.TimeoutError:
-                # Attempt to clear reactions if permitted
-                try:
-                    await message.clear_reactions()
-                except discord.Forbidden:
-                    pass
-                break
+                return None
+            if path is None or mode == "url":
+                return path, None
+            try:
+                return path, await self.artwork.read(path)
+            except OSError:
+                return None
+
+        urls = list(
+            {
+                url
+                for page in pages
+                for url in (page.image.url, page.thumbnail.url)
+                if url and url.startswith("http")
+            }
+        )
+        paths = dict(zip(urls, await asyncio.gather(*map(fetch, urls))))
+
+        for page, files in zip(pages, page_files):
+            for url, set_url in (
+                (page.image.url, page.set_image),
+                (page.thumbnail.url, page.set_thumbnail),
+            ):
+                local = paths.get(url)
+                if local is None:
+                    continue
+                path, data = local
+                if mode == "url":
+                    set_url(
+                        url=f"{self.artwork_base_url.rstrip('/')}/{path.name}"
+                    )
+                else:
+                    set_url(url=f"attachment://{path.name}")
+                    if (path.name, data) not in files:
+                        files.append((path.name, data))
+        return page_files
+
+    def _icon_url(self, language, category, item):
+        """Small artwork of a search result, from the snapshot if needed."""
+        image_urls = getattr(item, "image_urls", None)
+        if image_urls is not None:
+            return getattr(image_urls, "icon", None)
+        ankama_id = getattr(item, "ankama_id", None)
+        payload = self.index.payload(language, category, ankama_id)
+        if not payload:
+            return None
+        try:
+            image_urls = json.loads(payload).get("image_urls") or {}
+        except ValueError:
+            return None
+        return image_urls.get("icon")
 
 
 # Setup function to add the cog
@@ -0,0 +1,69 @@
+from typing import Iterable, List
+
+import discord
+
+# Discord limits
+EMBED_LIMIT = 6000
+FIELD_LIMIT = 25
+FIELD_VALUE_LIMIT = 1024
+
+
+def chunk_lines(
+    lines: Iterable[str], limit: int = FIELD_VALUE_LIMIT
+) -> List[str]:
+    """Join lines into blocks of at most ``limit`` characters."""
+    chunks = []
+    current = []
+    size = 0
+    for line in lines:
+        line = line[:limit]
+        if current and size + 1 + len(line) > limit:
+            chunks.append("\n".join(current))
+            current = []
+            size = 0
+        size += len(line) + (1 if current else 0)
+        current.append(line)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def add_lines_field(embed: discord.Embed, name: str, lines, inline=False):
+    """
+    Add a list of lines as a field, continued in untitled fields when it
+    is longer than a field value may be.
+    """
+    for number, chunk in enumerate(chunk_lines(lines)):
+        embed.add_field(
+            name=name if number == 0 else "\u200b", value=chunk, inline=inline
+        )
+    return embed
+
+
+def fit_pages(pages: List[discord.Embed]) -> List[discord.Embed]:
+    """
+    Split every embed over Discord's size or field count limits, moving
+    the overflowing fields to continuation pages with the same title.
+    """
+    fitted = []
+    for page in pages:
+        if len(page) <= EMBED_LIMIT and len(page.fields) <= FIELD_LIMIT:
+            fitted.append(page)
+            continue
+
+        fields = page.fields
+        current = page.copy()
+        current.clear_fields()
+        for field in fields:
+            field_size = len(field.name) + len(field.value)
+            if current.fields and (
+                len(current.fields) >= FIELD_LIMIT
+                or len(current) + field_size > EMBED_LIMIT
+            ):
+                fitted.append(current)
+                current = discord.Embed(title=page.title, color=page.color)
+            current.add_field(
+                name=field.name, value=field.value, inline=field.inline
+            )
+        fitted.append(current)
+    return fitted
@@ -0,0 +1,262 @@
+import json
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from .utils import normalize_name
+
+# Most results a filter may ask for
+MAX_RESULTS = 25
+
+
+class FilterItem:
+    """
+    An equipment entry as known to the effect index.
+
+    ``rolls`` packs (effect number, lowest, highest) triples in one int
+    array instead of a dict of tuples per item.
+    """
+
+    __slots__ = ("ankama_id", "name", "level", "type_name", "rolls")
+
+    def __init__(self, ankama_id, name, level, type_name, rolls):
+        self.ankama_id = ankama_id
+        self.name = name
+        self.level = level
+        self.type_name = type_name
+        self.rolls = rolls
+
+    def roll(self, effect_number: int) -> Optional[Tuple[int, int]]:
+        """(lowest, highest) roll of an effect, None if not rolled."""
+        rolls = self.rolls
+        for position in range(0, len(rolls), 3):
+            if rolls[position] == effect_number:
+                return rolls[position + 1], rolls[position + 2]
+        return None
+
+
+class FilterQuery(NamedTuple):
+    """A parsed dofusfilter query."""
+
+    effects: List[Tuple[str, Optional[int]]]  # (effect text, minimum)
+    min_level: Optional[int]
+    max_level: Optional[int]
+    item_type: Optional[str]
+    limit: int
+
+
+def effect_range(effect: dict) -> Optional[Tuple[int, int]]:
+    """(lowest, highest) roll of an effect from its JSON payload."""
+    low = effect.get("int_minimum")
+    if low is None:
+        return None
+    high = effect.get("int_maximum")
+    # Fixed values come with a 0 maximum
+    if not high or effect.get("ignore_int_max"):
+        high = low
+    return min(low, high), max(low, high)
+
+
+class EffectIndex:
+    """
+    Inverted index from effect type to the equipment rolling it, for one
+    language.
+
+    Each effect keeps its items sorted by highest roll, so "effect >= X"
+    is a bisection and the matches come out already ranked for top-K.
+    Postings are int arrays and effect names are interned (item names and
+    types come interned from ItemIndex.entries), so the index stays small
+    enough to keep every language resident.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        """``rows`` yields (ankama_id, name, level, type_name, payload)."""
+        self.items = {}
+        self.effect_names = {}  # normalized key -> display name
+        self._effect_numbers = {}  # normalized key -> effect number
+        postings = defaultdict(list)
+
+        for ankama_id, name, level, type_name, payload in rows:
+            try:
+                effects = json.loads(payload or "{}").get("effects") or []
+            except ValueError:
+                effects = []
+
+            rolls = {}
+            for effect in effects:
+                effect_name = (effect.get("type") or {}).get("name")
+                rolled = effect_range(effect)
+                if not effect_name or rolled is None:
+                    continue
+                key = normalize_name(effect_name)
+                number = self._effect_numbers.get(key)
+                if number is None:
+                    number = self._effect_numbers[key] = len(self.effect_names)
+                    self.effect_names[sys.intern(key)] = sys.intern(effect_name)
+                # An item may list an effect twice, keep its best roll
+                if number not in rolls or rolled[1] > rolls[number][1]:
+                    rolls[number] = rolled
+
+            packed = array("i")
+            for number, (low, high) in rolls.items():
+                packed.extend((number, low, high))
+                postings[number].append((high, ankama_id))
+            self.items[ankama_id] = FilterItem(
+                ankama_id, name, level, type_name, packed
+            )
+
+        self._values = {}
+        self._ids = {}
+        for number, entries in postings.items():
+            entries.sort()
+            self._values[number] = array("i", (high for high, i in entries))
+            self._ids[number] = array("i", (i for high, i in entries))
+        self._effect_keys = sorted(self.effect_names)
+        self._by_level = sorted(
+            self.items.values(), key=lambda item: item.level or 0, reverse=True
+        )
+
+    def __len__(self):
+        return len(self.items)
+
+    def find_effect(self, text: str) -> Optional[str]:
+        """
+        Key of the effect named ``text``, or of the only effect starting
+        with it. None when unknown or ambiguous.
+        """
+        key = normalize_name(text.strip())
+        if key in self.effect_names:
+            return key
+        start = bisect_left(self._effect_keys, key)
+        matches = []
+        for effect_key in self._effect_keys[start : start + 2]:
+            if effect_key.startswith(key):
+                matches.append(effect_key)
+        return matches[0] if len(matches) == 1 else None
+
+    def search(
+        self,
+        effects: List[Tuple[str, Optional[int]]],
+        min_level: Optional[int] = None,
+        max_level: Optional[int] = None,
+        item_type: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Tuple[FilterItem, List[Tuple[int, int]]]]:
+        """
+        Items rolling every (effect key, minimum) of ``effects`` within the
+        level range and of ``item_type``, best first.
+
+        Items are ranked by their highest roll of the first effect, or by
+        level when there is no effect filter. Returns (item, rolls) pairs,
+        with the (low, high) roll of every filtered effect.
+        """
+        type_key = normalize_name(item_type) if item_type else None
+
+        def accepted(item):
+            level = item.level or 0
+            if min_level is not None and level < min_level:
+                return False
+            if max_level is not None and level > max_level:
+                return False
+            if type_key and not normalize_name(item.type_name).startswith(
+                type_key
+            ):
+                return False
+            return True
+
+        effects = [
+            (self._effect_numbers[key], minimum) for key, minimum in effects
+        ]
+        if effects:
+            first_number, first_minimum = effects[0]
+            values = self._values.get(first_number, [])
+            ids = self._ids.get(first_number, [])
+            start = 0
+            if first_minimum is not None:
+                start = bisect_left(values, first_minimum)
+            candidates = (
+                self.items[ids[position]]
+                for position in range(len(ids) - 1, start - 1, -1)
+            )
+        else:
+            candidates = iter(self._by_level)
+
+        results = []
+        for item in candidates:
+            if not accepted(item):
+                continue
+            item_rolls = []
+            for number, minimum in effects:
+                rolled = item.roll(number)
+                if rolled is None or (
+                    minimum is not None and rolled[1] < minimum
+                ):
+                    break
+                item_rolls.append(rolled)
+            else:
+                results.append((item, item_rolls))
+                if len(results) >= limit:
+                    break
+        return results
+
+
+def parse_query(text: str, level_words, type_words) -> FilterQuery:
+    """
+    Parse comma separated filter clauses:
+
+    - ``<effect> >= N``, ``<effect> > N`` or just ``<effect>``
+    - ``level A-B``, ``level >= A``, ``level <= B`` or ``level N``
+    - ``type <item type>``
+    - ``top N``
+
+    ``level_words`` and ``type_words`` are the normalized keywords
+    accepted for the level and type clauses. Raises ValueError with the
+    offending clause.
+    """
+    effects = []
+    min_level = max_level = item_type = None
+    limit = 10
+
+    for clause in text.split(","):
+        clause = clause.strip()
+        if not clause:
+            continue
+        # Leading word, then the rest ("level>=150" is "level", ">=150")
+        keyword, rest = re.match(r"([^\W\d_]*)\s*(.*)", clause).groups()
+        keyword = normalize_name(keyword)
+
+        if keyword == "top":
+            if not rest.isdigit():
+                raise ValueError(clause)
+            limit = max(1, min(MAX_RESULTS, int(rest)))
+        elif keyword in level_words:
+            level_range = re.fullmatch(r"(\d+)\s*-\s*(\d+)", rest)
+            bound = re.fullmatch(r"(>=|>|<=|<)?\s*(\d+)", rest)
+            if level_range:
+                min_level, max_level = sorted(map(int, level_range.groups()))
+            elif bound:
+                operator, value = bound.group(1), int(bound.group(2))
+                if operator in (">=", ">"):
+                    min_level = value + (operator == ">")
+                elif operator in ("<=", "<"):
+                    max_level = value - (operator == "<")
+                else:
+                    min_level = max_level = value
+            else:
+                raise ValueError(clause)
+        elif keyword in type_words:
+            if not rest:
+                raise ValueError(clause)
+            item_type = rest
+        else:
+            effect = re.fullmatch(r"(.+?)\s*(>=|>)\s*(-?\d+)", clause)
+            if effect:
+                name, operator, value = effect.groups()
+                effects.append((name, int(value) + (operator == ">")))
+            else:
+                effects.append((clause, None))
+
+    return FilterQuery(effects, min_level, max_level, item_type, limit)
@@ -0,0 +1,77 @@
+import heapq
+from array import array
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Iterable, List, Tuple
+
+
+def trigrams(key: str) -> set:
+    """Padded character trigrams of an already normalized name."""
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyMatcher:
+    """
+    Trigram inverted index over the normalized names of one language.
+
+    Candidates are gathered from the posting lists of the query trigrams
+    and ranked by Jaccard similarity of their trigram sets.
+    """
+
+    # Upper bound on the posting entries scanned per query. The rarest
+    # trigrams are scanned first, so common ones ("de ", " le") are the
+    # first to be skipped once the budget is reached.
+    scan_budget = 3000
+
+    def __init__(self, names: Iterable[Tuple[str, str]]):
+        """``names`` yields (normalized key, display name) pairs."""
+        self._keys = []
+        self._names = []
+        postings = defaultdict(list)
+        seen = set()
+        for key, name in names:
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            name_id = len(self._names)
+            grams = trigrams(key)
+            self._keys.append(key)
+            self._names.append(name)
+            for gram in grams:
+                postings[gram].append(name_id)
+        self._postings = {
+            gram: array("I", ids) for gram, ids in postings.items()
+        }
+
+    def __len__(self):
+        return len(self._names)
+
+    def suggest(
+        self, key: str, limit: int = 5, min_score: float = 0.3
+    ) -> List[str]:
+        """Display names most similar to the normalized ``key``, best first."""
+        grams = trigrams(key)
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        if not lists:
+            return []
+
+        lists.sort(key=len)
+        scanned = 0
+        for used, ids in enumerate(lists):
+            scanned += len(ids)
+            if scanned > self.scan_budget and used >= 3:
+                lists = lists[:used]
+                break
+        counts = Counter(chain.from_iterable(lists))
+
+        # The partial shared count is a cheap pre-filter, the exact score
+        # is only computed for the best few.
+        scored = []
+        for name_id, partial in counts.most_common(limit * 5):
+            candidate = trigrams(self._keys[name_id])
+            score = len(grams & candidate) / len(grams | candidate)
+            if score >= min_score:
+                scored.append((score, name_id))
+        best = heapq.nlargest(limit, scored)
+        return [self._names[name_id] for score, name_id in best]
@@ -0,0 +1,306 @@
+import hashlib
+import sqlite3
+import sys
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+from .utils import normalize_name
+
+# Extra detail fields requested for every entry of a paginated list
+ITEM_FIELDS = [
+    "recipe",
+    "description",
+    "conditions",
+    "effects",
+    "is_weapon",
+    "pods",
+    "parent_set",
+    "critical_hit_probability",
+    "critical_hit_bonus",
+    "max_cast_per_turn",
+    "ap_cost",
+    "range",
+]
+
+# (api class, paginated list method, {fields parameter: fields}, category)
+# for every catalogue we index.
+CATALOGUES = [
+    ("MountsApi", "get_mounts_list", {"fields_mount": ["effects"]}, "Mounts"),
+    (
+        "ConsumablesApi",
+        "get_items_consumables_list",
+        {"fields_item": ITEM_FIELDS},
+        "Consumables",
+    ),
+    (
+        "EquipmentApi",
+        "get_items_equipment_list",
+        {"fields_item": ITEM_FIELDS},
+        "Equipment",
+    ),
+    (
+        "CosmeticsApi",
+        "get_cosmetics_list",
+        {"fields_item": ITEM_FIELDS},
+        "Cosmetics",
+    ),
+    (
+        "ResourcesApi",
+        "get_items_resources_list",
+        {"fields_item": ITEM_FIELDS},
+        "Resources",
+    ),
+    (
+        "QuestItemsApi",
+        "get_items_quest_list",
+        {"fields_item": ITEM_FIELDS},
+        "QuestItems",
+    ),
+    (
+        "SetsApi",
+        "get_sets_list",
+        {"fields_set": ["effects", "equipment_ids"]},
+        "Sets",
+    ),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    language TEXT NOT NULL,
+    category TEXT NOT NULL,
+    ankama_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    level INTEGER,
+    type_name TEXT,
+    content_hash TEXT,
+    payload TEXT,
+    PRIMARY KEY (language, category, ankama_id)
+);
+CREATE INDEX IF NOT EXISTS items_name_key ON items (language, name_key);
+CREATE TABLE IF NOT EXISTS catalogues (
+    language TEXT NOT NULL,
+    category TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (language, category)
+);
+"""
+
+
+class IndexedItem(NamedTuple):
+    """A catalogue entry as stored in the local index."""
+
+    category: str
+    ankama_id: int
+    name: str
+    level: Optional[int]
+    type_name: Optional[str]
+
+
+def catalogue_entries(api_response) -> list:
+    """Return the list of entries from a list response."""
+    if isinstance(api_response, list):
+        return api_response
+    for attr in ("items", "sets"):
+        entries = getattr(api_response, attr, None)
+        if entries is not None:
+            return entries
+    return []
+
+
+class ItemIndex:
+    """
+    On-disk index of item, mount and set names per language.
+
+    Names are stored together with their normalized key so exact
+    lookups are plain index scans. The database runs in WAL mode with
+    two connections: the executor writes and scans through one, while
+    the point lookups made on the event loop go through the other, so
+    they never wait behind a sync or a scan. Each connection has its
+    own lock.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            # Indexes created before delta sync lack the snapshot columns
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(items)")
+            }
+            for column in ("content_hash", "payload"):
+                if column not in columns:
+                    self._conn.execute(
+                        f"ALTER TABLE items ADD COLUMN {column} TEXT"
+                    )
+            self._conn.commit()
+        self._read_lock = threading.Lock()
+        self._reader = sqlite3.connect(str(path), check_same_thread=False)
+
+    def close(self):
+        with self._read_lock:
+            self._reader.close()
+        with self._lock:
+            self._conn.close()
+
+    def synced(self, language: str) -> set:
+        """Categories of ``language`` that were synced at least once."""
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT category FROM catalogues WHERE language = ?",
+                (language,),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def updated_at(self, language: str, category: str) -> Optional[float]:
+        """When a catalogue was last synced, as a UNIX timestamp."""
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT updated_at FROM catalogues"
+                " WHERE language = ? AND category = ?",
+                (language, category),
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_stale(self):
+        """
+        Make every catalogue due for sync, keeping its rows.
+        Blocking, meant to run in an executor.
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("UPDATE catalogues SET updated_at = 0")
+
+    def exact(
+        self, language: str, key: str, category: Optional[str] = None
+    ) -> List[IndexedItem]:
+        """All entries whose normalized name equals ``key``."""
+        query = (
+            "SELECT category, ankama_id, name, level, type_name FROM items"
+            " WHERE language = ? AND name_key = ?"
+        )
+        params = [language, key]
+        if category is not None:
+            query += " AND category = ?"
+            params.append(category)
+        with self._read_lock:
+            rows = self._reader.execute(query, params).fetchall()
+        return [IndexedItem(*row) for row in rows]
+
+    def names(self, language: str) -> List[tuple]:
+        """
+        Every distinct (normalized key, name) pair of ``language``.
+        The strings are interned, so every lookup built from them shares
+        one copy.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name_key, MIN(name) FROM items WHERE language = ?"
+                " GROUP BY name_key",
+                (language,),
+            ).fetchall()
+        return [(sys.intern(key), sys.intern(name)) for key, name in rows]
+
+    def entries(self, language: str, category: str) -> List[tuple]:
+        """
+        (ankama_id, name, level, type_name, payload) of a catalogue.
+        Names and type names are interned like in ``names``.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ankama_id, name, level, type_name, payload FROM items"
+                " WHERE language = ? AND category = ?",
+                (language, category),
+            ).fetchall()
+        return [
+            (
+                ankama_id,
+                sys.intern(name),
+                level,
+                sys.intern(type_name) if type_name else None,
+                payload,
+            )
+            for ankama_id, name, level, type_name, payload in rows
+        ]
+
+    def payload(
+        self, language: str, category: str, ankama_id: int
+    ) -> Optional[str]:
+        """JSON snapshot of one entry, as last downloaded."""
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT payload FROM items"
+                " WHERE language = ? AND category = ? AND ankama_id = ?",
+                (language, category, ankama_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def sync_catalogue(self, language: str, category: str, entries):
+        """
+        Bring one (language, category) catalogue in line with ``entries``.
+
+        Entries are compared with the stored snapshot by ankama_id and a
+        hash of their JSON, so only new or changed rows are written and
+        only vanished ones deleted. Returns (written, deleted), or None
+        when a catalogue that had rows came back empty: that is a broken
+        download, so the stored snapshot and its sync time are kept.
+        Blocking, meant to run in an executor.
+        """
+        rows = {}
+        for entry in entries:
+            ankama_id = getattr(entry, "ankama_id", None)
+            name = getattr(entry, "name", None)
+            if ankama_id is None or not name:
+                continue
+            payload = entry.to_json()
+            rows[ankama_id] = (
+                language,
+                category,
+                ankama_id,
+                name,
+                normalize_name(name),
+                getattr(entry, "level", None),
+                getattr(getattr(entry, "type", None), "name", None),
+                hashlib.blake2b(payload.encode(), digest_size=16).hexdigest(),
+                payload,
+            )
+
+        with self._lock:
+            stored = dict(
+                self._conn.execute(
+                    "SELECT ankama_id, content_hash FROM items"
+                    " WHERE language = ? AND category = ?",
+                    (language, category),
+                )
+            )
+            if stored and not rows:
+                return None
+            changed = [
+                row
+                for ankama_id, row in rows.items()
+                if stored.get(ankama_id) != row[7]
+            ]
+            deleted = [
+                (language, category, ankama_id)
+                for ankama_id in stored
+                if ankama_id not in rows
+            ]
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO items"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    changed,
+                )
+                self._conn.executemany(
+                    "DELETE FROM items"
+                    " WHERE language = ? AND category = ? AND ankama_id = ?",
+                    deleted,
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO catalogues VALUES (?, ?, ?)",
+                    (language, category, time.time()),
+                )
+        return len(changed), len(deleted)
@@ -0,0 +1,173 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+
+
+class TokenBucket:
+    """``rate`` tokens per second, up to ``capacity`` saved up."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def delay(self, cost: float = 1) -> float:
+        """Seconds until ``cost`` tokens are available."""
+        self._refill()
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def available(self) -> float:
+        """Tokens available right now."""
+        self._refill()
+        return self.tokens
+
+    def take(self, cost: float = 1):
+        self._refill()
+        self.tokens -= min(cost, self.capacity)
+
+    def configure(self, rate: float, capacity: float):
+        """Change the rate and capacity, keeping the saved up tokens."""
+        self._refill()
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = min(self.tokens, capacity)
+
+
+class FairLimiter:
+    """
+    Token bucket limiter with a global budget and one budget per guild.
+
+    Waiters are queued per guild and served round robin, so a busy guild
+    can't starve the others: each turn goes to the next guild whose own
+    bucket and the global bucket both have enough tokens.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        guild_rate: float,
+        guild_capacity: float,
+    ):
+        self.bucket = TokenBucket(rate, capacity)
+        self.guild_rate = guild_rate
+        self.guild_capacity = guild_capacity
+        self._guild_buckets = {}
+        self._queues = OrderedDict()  # guild id -> deque of (cost, future)
+        self._wakeup = asyncio.Event()
+        self._dispatcher = None
+
+        # Metrics
+        self.granted = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+
+    def __len__(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, guild_id, cost: float = 1):
+        """Wait for ``cost`` tokens from the global and guild budgets."""
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(guild_id, deque()).append((cost, future))
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        start = time.monotonic()
+        try:
+            await future
+        finally:
+            waited = time.monotonic() - start
+            self.waited += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def configure(
+        self,
+        rate: float,
+        capacity: float,
+        guild_rate: float,
+        guild_capacity: float,
+    ):
+        """Change the budgets, keeping the waiters in their queues."""
+        self.bucket.configure(rate, capacity)
+        self.guild_rate = guild_rate
+        self.guild_capacity = guild_capacity
+        for bucket in self._guild_buckets.values():
+            bucket.configure(guild_rate, guild_capacity)
+        self._wakeup.set()
+
+    def _guild_bucket(self, guild_id):
+        bucket = self._guild_buckets.get(guild_id)
+        if bucket is None:
+            bucket = self._guild_buckets[guild_id] = TokenBucket(
+                self.guild_rate, self.guild_capacity
+            )
+        return bucket
+
+    async def _dispatch(self):
+        while True:
+            # Drop the waiters that gave up
+            for guild_id in list(self._queues):
+                queue = self._queues[guild_id]
+                while queue and queue[0][1].done():
+                    queue.popleft()
+                if not queue:
+                    del self._queues[guild_id]
+
+            if not self._queues:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            wait = None
+            for guild_id, queue in self._queues.items():
+                cost, future = queue[0]
+                guild_bucket = self._guild_bucket(guild_id)
+                delay = max(self.bucket.delay(cost), guild_bucket.delay(cost))
+                if delay == 0:
+                    self.bucket.take(cost)
+                    guild_bucket.take(cost)
+                    queue.popleft()
+                    future.set_result(None)
+                    self.granted += 1
+                    # Next turn goes to the guilds behind this one
+                    self._queues.move_to_end(guild_id)
+                    break
+                wait = delay if wait is None else min(wait, delay)
+            else:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        for queue in self._queues.values():
+            for cost, future in queue:
+                future.cancel()
+        self._queues.clear()
+
+    def stats(self) -> dict:
+        return {
+            "queued": len(self),
+            "guilds_waiting": len(self._queues),
+            "granted": self.granted,
+            "avg_wait": self.waited / self.granted if self.granted else 0.0,
+            "max_wait": self.max_wait,
+            "tokens": self.bucket.available(),
+            "capacity": self.bucket.capacity,
+        }
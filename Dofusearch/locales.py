@@ -0,0 +1,52 @@
+import json
+import os
+from types import MappingProxyType
+
+
+def _flatten(tree: dict, prefix: str = ""):
+    """Yield ("a.b.c", value) pairs from nested dictionaries."""
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+class Locales:
+    """
+    Every ``locales/*.json`` bundle, flattened once into read-only tables.
+
+    Nothing here changes after loading, so any number of guilds can
+    translate in different languages at the same time.
+    """
+
+    def __init__(self, path: str, fallback: str = "en"):
+        bundles = {}
+        for filename in sorted(os.listdir(path)):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(path, filename), encoding="utf-8") as f:
+                data = json.load(f)
+            for language, tree in data.items():
+                bundles[language] = MappingProxyType(dict(_flatten(tree)))
+
+        self.bundles = MappingProxyType(bundles)
+        self.fallback = fallback
+        self._translators = {
+            language: self._make_translator(table)
+            for language, table in bundles.items()
+        }
+
+    def _make_translator(self, table):
+        fallback = self.bundles.get(self.fallback, {})
+
+        def translate(key: str) -> str:
+            return table.get(key) or fallback.get(key, key)
+
+        return translate
+
+    def translator(self, language: str):
+        """Return a ``_(key)`` function for ``language``."""
+        return self._translators.get(language) or self._translators.get(
+            self.fallback, lambda key: key
+        )
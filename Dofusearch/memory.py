@@ -0,0 +1,56 @@
+import asyncio
+import gc
+import sys
+from types import (
+    BuiltinFunctionType,
+    CoroutineType,
+    FrameType,
+    FunctionType,
+    GeneratorType,
+    MethodType,
+    ModuleType,
+)
+
+# Shared by everything, not owned by the measured object. Tasks (futures),
+# coroutines, frames and bound methods lead to the cog, the bot and most
+# of the process, e.g. from the loads in flight of a cache.
+_SKIP = (
+    type,
+    ModuleType,
+    FunctionType,
+    BuiltinFunctionType,
+    MethodType,
+    asyncio.Future,
+    CoroutineType,
+    GeneratorType,
+    FrameType,
+)
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    """
+    Approximate size in bytes of ``obj`` and everything it references.
+
+    Pass the same ``seen`` set to several calls to count shared objects
+    (interned strings, for instance) only once, in the first of them.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    pending = [obj]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SKIP):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+    return size
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
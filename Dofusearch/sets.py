@@ -0,0 +1,35 @@
+from typing import List, NamedTuple, Tuple
+
+
+class SetMember(NamedTuple):
+    """A resolved item of a set."""
+
+    category: str
+    item: object
+
+
+class SetGraph(NamedTuple):
+    """A set together with its resolved items, in set order."""
+
+    equipment_set: object
+    members: List[SetMember]
+
+
+def bonus_table(equipment_set) -> List[Tuple[int, List[str]]]:
+    """
+    (piece count, effect lines) of every set bonus, fewest pieces first.
+    Counts without a single displayable effect are left out.
+    """
+    table = []
+    for count, effects in (
+        getattr(equipment_set, "effects", None) or {}
+    ).items():
+        lines = [
+            f"- {effect.formatted}"
+            for effect in effects or []
+            if getattr(effect, "formatted", None)
+        ]
+        if lines:
+            table.append((int(count), lines))
+    table.sort()
+    return table
@@ -0,0 +1,13 @@
+import unicodedata
+
+
+def remove_accents(input_str: str) -> str:
+    # Removes all accent/diacritic marks from the given string
+    # and returns the normalized version (e.g., "á" -> "a").
+    nf = unicodedata.normalize("NFD", input_str)
+    return "".join(ch for ch in nf if unicodedata.category(ch) != "Mn")
+
+
+def normalize_name(name: str) -> str:
+    """Key used to compare item names: no accents, lower case."""
+    return remove_accents(name or "").lower()
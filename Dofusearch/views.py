@@ -0,0 +1,170 @@
+import io
+import time
+
+import discord
+
+
+def attachments(files):
+    """New discord.File objects for (file name, bytes) pairs."""
+    return [
+        discord.File(io.BytesIO(data), filename=name) for name, data in files
+    ]
+
+
+class ViewRegistry:
+    """
+    Every open view of the cog with the time it was last used.
+
+    Views never time out on their own; ``sweep`` is called from one cog
+    loop and expires every view idle for ``idle`` seconds, so there is
+    no timer per message.
+    """
+
+    def __init__(self, idle: float = 120):
+        self.idle = idle
+        self._views = {}
+
+    def __len__(self):
+        return len(self._views)
+
+    def add(self, view):
+        view.registry = self
+        self._views[view] = time.monotonic()
+
+    def touch(self, view):
+        if view in self._views:
+            self._views[view] = time.monotonic()
+
+    async def sweep(self):
+        """Expire the views that have been idle for too long."""
+        now = time.monotonic()
+        expired = [
+            view
+            for view, last_used in self._views.items()
+            if now - last_used >= self.idle
+        ]
+        for view in expired:
+            del self._views[view]
+            await view.expire()
+
+    async def close(self):
+        """Expire every open view."""
+        views = list(self._views)
+        self._views.clear()
+        for view in views:
+            await view.expire()
+
+
+class Paginator(discord.ui.View):
+    """
+    Pages through a list of embeds with buttons.
+
+    Only the author of the command can turn the pages. The view is kept
+    alive by the ViewRegistry it is added to. ``page_files`` optionally
+    lists, for every page, the (file name, bytes) of the local images it
+    shows as attachments. They are held in memory, so the artwork cache
+    may drop the files while the view is open.
+    """
+
+    def __init__(self, author, pages, page_files=None):
+        super().__init__(timeout=None)
+        self.author = author
+        self.pages = pages
+        self.page_files = page_files
+        self.current_page = 0
+        self.message = None
+        self.registry = None
+        self._refresh()
+
+    def _refresh(self):
+        """Point the buttons at the current page."""
+        single_page = len(self.pages) == 1
+        self.previous.disabled = single_page
+        self.next.disabled = single_page
+        self.counter.label = f"{self.current_page + 1}/{len(self.pages)}"
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user != self.author:
+            return False
+        if self.registry is not None:
+            self.registry.touch(self)
+        return True
+
+    async def _show_page(self, interaction, page):
+        self.current_page = page % len(self.pages)
+        self._refresh()
+        kwargs = {}
+        if self.page_files:
+            kwargs["attachments"] = attachments(
+                self.page_files[self.current_page]
+            )
+        await interaction.response.edit_message(
+            embed=self.pages[self.current_page], view=self, **kwargs
+        )
+
+    @discord.ui.button(label="⬅", style=discord.ButtonStyle.secondary, row=0)
+    async def previous(self, interaction, button):
+        await self._show_page(interaction, self.current_page - 1)
+
+    @discord.ui.button(
+        label="1/1", style=discord.ButtonStyle.secondary, disabled=True, row=0
+    )
+    async def counter(self, interaction, button):
+        pass
+
+    @discord.ui.button(label="➡", style=discord.ButtonStyle.secondary, row=0)
+    async def next(self, interaction, button):
+        await self._show_page(interaction, self.current_page + 1)
+
+    async def expire(self):
+        """Stop listening and grey out the components."""
+        self.stop()
+        for child in self.children:
+            child.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+
+class BatchView(Paginator):
+    """
+    Pages through a batch search summary.
+
+    Each page comes with the options of the items it lists; picking one
+    in the select menu calls ``on_select`` with the option value.
+    """
+
+    def __init__(
+        self,
+        author,
+        pages,
+        page_options,
+        on_select,
+        placeholder,
+        page_files=None,
+    ):
+        self.page_options = page_options
+        self.on_select = on_select
+        self.select = discord.ui.Select(placeholder=placeholder, row=1)
+        super().__init__(author, pages, page_files)
+        self.select.callback = self._selected
+        self.add_item(self.select)
+
+    def _refresh(self):
+        """Point the buttons and the select menu at the current page."""
+        super()._refresh()
+        options = self.page_options[self.current_page]
+        self.select.options = [
+            discord.SelectOption(label=label[:100], description=desc, value=v)
+            for label, desc, v in options
+        ]
+        # A select menu needs at least one option
+        if not options:
+            self.select.options = [discord.SelectOption(label="-", value="-")]
+        self.select.disabled = not options
+
+    async def _selected(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+        await self.on_select(self.select.values[0])
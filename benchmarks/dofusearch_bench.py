@@ -0,0 +1,398 @@
+"""
+Benchmark of the Dofusearch search -> detail -> embed pipeline.
+
+A local fake Dofus Dude API replays the JSON fixtures of
+``benchmarks/fixtures`` with configurable latency and error rate, and
+the cog's own code paths (_resolve, then _render) are driven against it
+at a configurable concurrency, without Discord.
+
+Run it from the repository root, with Red-DiscordBot and dofusdude
+installed:
+
+    python benchmarks/dofusearch_bench.py --requests 500 --concurrency 20
+    python benchmarks/dofusearch_bench.py --latency 0.2 --error-rate 0.1
+    python benchmarks/dofusearch_bench.py --index --cold
+    python benchmarks/dofusearch_bench.py --search-rate 5 --search-burst 10
+
+It prints latency percentiles, the time searches waited for the
+limiter, the upstream calls per endpoint, cache hit rates, event loop
+lag, and every search that resolved to another category than the
+fixture expects.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "es.json")
+
+# /{game}/v1/{language}/{collection}[/search|/{ankama_id}]
+ROUTE = re.compile(
+    r"^/(?P<game>[^/]+)/v1/(?P<language>[a-z]{2})/"
+    r"(?P<collection>items/[a-z]+|mounts|sets)"
+    r"(?:/(?P<tail>search|\d+))?$"
+)
+VERSION_ROUTE = re.compile(r"^/[^/]+/v1/meta/version$")
+
+
+def fold(text):
+    """Lower case, accent-free text, as the API search compares it."""
+    text = unicodedata.normalize("NFD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+class FakeDofusDude(ThreadingHTTPServer):
+    """
+    Serves fixtures the way api.dofusdu.de serves its data, sleeping
+    ``latency`` (+/- ``jitter``) seconds per request and failing a share
+    ``error_rate`` of them with a 500.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fixtures, latency=0.0, jitter=0.0, error_rate=0.0):
+        super().__init__(("127.0.0.1", 0), FakeDofusDudeHandler)
+        self.collections = fixtures["collections"]
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, endpoint):
+        with self._lock:
+            self.calls[endpoint] += 1
+
+
+class FakeDofusDudeHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if VERSION_ROUTE.match(url.path):
+            server.count("meta")
+            self._send(200, {"version": "bench", "release": "bench"})
+            return
+
+        match = ROUTE.match(url.path)
+        if not match:
+            server.count("unknown")
+            self._send(404, {"message": "not found"})
+            return
+
+        collection = match["collection"]
+        tail = match["tail"]
+        endpoint = "list" if tail is None else "search"
+        if tail and tail.isdigit():
+            endpoint = "detail"
+        server.count(endpoint)
+
+        if random.random() < server.error_rate:
+            self._send(500, {"message": "injected error"})
+            return
+
+        entries = server.collections.get(collection, [])
+        if endpoint == "detail":
+            entry = next(
+                (e for e in entries if e["ankama_id"] == int(tail)), None
+            )
+            if entry is None:
+                self._send(404, {"message": "not found"})
+            else:
+                self._send(200, entry)
+        elif endpoint == "search":
+            query = fold(params.get("query", [""])[0])
+            found = [e for e in entries if query in fold(e["name"])]
+            if found:
+                self._send(200, found)
+            else:
+                self._send(404, {"message": "no results"})
+        else:
+            size = int(params.get("page[size]", ["50"])[0])
+            number = int(params.get("page[number]", ["1"])[0])
+            page = entries[(number - 1) * size : number * size]
+            links = {}
+            if number * size < len(entries):
+                links["next"] = f"{url.path}?page[number]={number + 1}"
+            key = "sets" if collection == "sets" else "items"
+            self._send(200, {"_links": links, key: page})
+
+
+class FakeBot:
+    """The only part of the bot the cog needs outside Discord."""
+
+    async def wait_until_ready(self):
+        pass
+
+
+def percentile(values, share):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args, fixtures, server):
+    # Red keeps its data under DATA_PATH; use a throwaway one
+    from redbot.core import data_manager
+
+    data_manager.basic_config = dict(
+        data_manager.basic_config_default, DATA_PATH=tempfile.mkdtemp()
+    )
+
+    sys.path.insert(0, ROOT)
+    from Dofusearch.api import DofusDudeClient
+    from Dofusearch.dofusearch import GAME, SUPPORTED_LANGUAGES, Dofusearch
+    from Dofusearch.utils import normalize_name
+
+    language = fixtures["language"]
+    cog = Dofusearch(FakeBot())
+    cog.configuration.host = server.url
+    cog.client = DofusDudeClient(cog.configuration, pool_size=args.pool_size)
+    cog.client.start_monitor()
+    limiter = cog.limiter
+    limiter.configure(
+        args.search_rate or limiter.bucket.rate,
+        args.search_burst or limiter.bucket.capacity,
+        args.guild_search_rate or limiter.guild_rate,
+        args.guild_search_burst or limiter.guild_capacity,
+    )
+
+    if args.index:
+        # Only sync the fixture language, the others have no data
+        cog_languages = list(SUPPORTED_LANGUAGES)
+        SUPPORTED_LANGUAGES[:] = [language]
+        try:
+            await cog.index_loop.coro(cog)
+            await cog._build_lookups(language)
+        finally:
+            SUPPORTED_LANGUAGES[:] = cog_languages
+        server.calls.clear()
+
+    expected = fixtures["expected"]
+    queries = list(expected) + fixtures.get("misses", [])
+    rng = random.Random(args.seed)
+    workload = [rng.choice(queries) for _ in range(args.requests)]
+
+    latencies = []
+    outcomes = Counter()
+    mismatches = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(number, query):
+        async with semaphore:
+            if args.cold:
+                cog.detail_cache.invalidate()
+                cog.set_cache.invalidate()
+                cog.render_cache.invalidate()
+            start = time.perf_counter()
+            try:
+                results = await cog._resolve(
+                    GAME,
+                    language,
+                    normalize_name(query),
+                    guild_id=number % args.guilds,
+                )
+                if results:
+                    category, item = results
+                    pages = await cog._render(GAME, language, category, item)
+                    outcomes["found"] += 1
+                    outcomes[f"{len(pages)} page(s)"] += 1
+                    if expected.get(query, category) != category:
+                        mismatches[(query, category)] += 1
+                else:
+                    outcomes["not found"] += 1
+                    if query in expected:
+                        mismatches[(query, None)] += 1
+            except Exception as e:
+                outcomes[f"error: {type(e).__name__}"] += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n, q) for n, q in enumerate(workload)))
+    elapsed = time.perf_counter() - started
+
+    client_stats = cog.client.stats()
+    breaker = cog.client.breaker.stats()
+    limiter_stats = cog.limiter.stats()
+    report = {
+        "requests": len(workload),
+        "concurrency": args.concurrency,
+        "elapsed": elapsed,
+        "throughput": len(workload) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies, default=0.0),
+        "mean": statistics.fmean(latencies) if latencies else 0.0,
+        "limiter_granted": limiter_stats["granted"],
+        "limiter_avg_wait": limiter_stats["avg_wait"],
+        "limiter_max_wait": limiter_stats["max_wait"],
+        "limiter_total_wait": cog.limiter.waited,
+        "outcomes": dict(outcomes),
+        "upstream_calls": dict(server.calls),
+        "client_calls": client_stats["calls"],
+        "coalesced_searches": cog.coalesced_searches,
+        "detail_hit_rate": cog.detail_cache.stats()["hit_rate"],
+        "render_hit_rate": cog.render_cache.stats()["hit_rate"],
+        "loop_lag_max": client_stats["loop_lag_max"],
+        "loop_blocked": client_stats["loop_blocked"],
+        "breaker": breaker["state"],
+        "breaker_opened": breaker["opened"],
+        "mismatches": [
+            {"query": query, "category": category, "count": count}
+            for (query, category), count in mismatches.items()
+        ],
+    }
+
+    cog.limiter.close()
+    cog.client.close()
+    cog.executor.shutdown(wait=False)
+    cog.index.close()
+    return report
+
+
+def print_report(report):
+    ms = 1000
+    print(
+        f"{report['requests']} requests at concurrency "
+        f"{report['concurrency']} in {report['elapsed']:.2f} s "
+        f"({report['throughput']:.1f} req/s)"
+    )
+    print(
+        f"Latency: p50 {report['p50'] * ms:.1f} ms | "
+        f"p95 {report['p95'] * ms:.1f} ms | "
+        f"p99 {report['p99'] * ms:.1f} ms | "
+        f"max {report['max'] * ms:.1f} ms"
+    )
+    print(
+        f"Limiter: {report['limiter_granted']} searches, waited "
+        f"avg {report['limiter_avg_wait'] * ms:.1f} ms | "
+        f"max {report['limiter_max_wait'] * ms:.1f} ms | "
+        f"total {report['limiter_total_wait']:.2f} s"
+    )
+    print(f"Outcomes: {report['outcomes']}")
+    print(
+        f"Upstream calls: {report['upstream_calls']} "
+        f"(client: {report['client_calls']}, "
+        f"coalesced searches: {report['coalesced_searches']})"
+    )
+    print(
+        f"Cache hit rate: details {report['detail_hit_rate']:.1%} | "
+        f"renders {report['render_hit_rate']:.1%}"
+    )
+    print(
+        f"Event loop lag: max {report['loop_lag_max'] * ms:.1f} ms, "
+        f"blocked {report['loop_blocked']:.2f} s"
+    )
+    print(
+        f"Circuit breaker: {report['breaker']} "
+        f"(opened {report['breaker_opened']} times)"
+    )
+    for mismatch in report["mismatches"]:
+        print(
+            f"MISMATCH: {mismatch['query']!r} -> {mismatch['category']} "
+            f"({mismatch['count']} times)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--guilds", type=int, default=5)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="seconds per API call"
+    )
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of 500s, 0-1"
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="sync the fixtures into the local index first",
+    )
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="empty the caches before every request",
+    )
+    parser.add_argument(
+        "--search-rate",
+        type=float,
+        help="searches per second for the whole bot (default: the cog's)",
+    )
+    parser.add_argument("--search-burst", type=int)
+    parser.add_argument(
+        "--guild-search-rate", type=float, help="searches per second per guild"
+    )
+    parser.add_argument("--guild-search-burst", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--json", action="store_true", help="print the report as JSON"
+    )
+    args = parser.parse_args()
+
+    with open(args.fixtures, encoding="utf-8") as f:
+        fixtures = json.load(f)
+
+    server = FakeDofusDude(
+        fixtures,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        report = asyncio.run(run(args, fixtures, server))
+    finally:
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    # Wrong categories are regressions
+    sys.exit(1 if report["mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()